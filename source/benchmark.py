@@ -0,0 +1,274 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+# Must be set before pygame creates a display
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+from constants import DEFAULT_DATA_PATH, PROJECT_ROOT, ROCKET_IMAGE_PATH, ROCKET_SVG_PATH
+from dashboard import Dashboard
+from data_loader import DataLoader
+from renderer import Renderer
+from rocket_renderer import RocketRenderer
+from simulation import Simulation
+from telemetry_cache import default_cache_dir
+from vector_rocket_renderer import VectorRocketRenderer
+
+RESULTS_VERSION = 1
+DEFAULT_ROWS = (0, 100_000, 1_000_000)  # 0 is the recorded file as-is
+DEFAULT_THRESHOLD = 0.10  # fractional slowdown reported as a regression
+MIN_DELTA = 1e-6  # absolute slowdown [s] below which timings are treated as noise
+WRITE_CHUNK_ROWS = 1 << 18
+BENCH_TIME = 300.0  # flight time the per-frame stages are measured at (after separation)
+
+
+def scaled_dataset(source_path, rows, out_dir=None):
+    # Resamples the recorded flight onto `rows` evenly spaced samples and
+    # writes it as a CSV with the same header. Files are kept keyed by source
+    # size/mtime and row count, so only the first run pays for writing them.
+    out_dir = out_dir or os.path.join(default_cache_dir(), 'benchmarks')
+    os.makedirs(out_dir, exist_ok=True)
+    stat = os.stat(source_path)
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    path = os.path.join(out_dir, f"{stem}-{stat.st_size}-{int(stat.st_mtime)}-{rows}.csv")
+    if os.path.exists(path):
+        return path
+
+    source = DataLoader(source_path, use_cache=False).load_data()
+    times = source['Time [s]']
+    columns = source.columns
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as file:
+        file.write(','.join(source.schema.names) + '\n')
+        for first in range(0, rows, WRITE_CHUNK_ROWS):
+            count = min(WRITE_CHUNK_ROWS, rows - first)
+            grid = times[0] + (times[-1] - times[0]) * (first + np.arange(count)) / max(rows - 1, 1)
+            values = np.column_stack([np.interp(grid, times, column) for column in columns])
+            np.savetxt(file, values, delimiter=',', fmt='%.6f')
+    os.replace(tmp_path, path)
+    return path
+
+
+def measure(function, repeat=5):
+    # Seconds per call: calls are batched like `python -m timeit` until a
+    # batch takes at least 0.2 s, then the batch is repeated
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    samples = np.array(timer.repeat(repeat, number)) / number
+    return {
+        'median_s': float(np.median(samples)),
+        'min_s': float(samples.min()),
+        'mean_s': float(samples.mean()),
+        'calls': number * repeat,
+    }
+
+
+class BenchmarkSuite:
+    def __init__(self, width=1000, height=600, repeat=5):
+        pygame.init()
+        self.screen = pygame.display.set_mode((width, height))
+        self.width = width
+        self.height = height
+        self.repeat = repeat
+
+    def run_dataset(self, path):
+        results = {}
+        results['load_csv'] = measure(lambda: DataLoader(path, use_cache=False).load_data(), self.repeat)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            DataLoader(path, cache_dir=cache_dir).load_data()
+            results['load_cached'] = measure(lambda: DataLoader(path, cache_dir=cache_dir).load_data(), self.repeat)
+        data = DataLoader(path, use_cache=False).load_data()
+        results['simulation_init'] = measure(lambda: Simulation(data), self.repeat)
+
+        simulation = Simulation(data)
+        start = simulation.clock.start
+
+        def update():
+            if simulation.clock.at_end():
+                simulation.seek(start)
+            simulation.update(1 / 60)
+
+        results['simulation_update'] = measure(update, self.repeat)
+        simulation.seek(BENCH_TIME)
+        results['get_current_data'] = measure(simulation.get_current_data, self.repeat)
+        results.update(self.run_renderer(simulation))
+        return len(data), results
+
+    def run_renderer(self, simulation):
+        results = {}
+        renderer = Renderer(self.screen, self.width, self.height, seed=0)
+        renderer.render(simulation)
+        current_data = simulation.get_current_data()
+        pos_x, pos_y = renderer.viewport.project(current_data['Downrange distance [km]'], current_data['Smoothed altitude [km]'])
+
+        def build_pyramid():
+            renderer.pyramid = None
+            renderer.draw_full_trajectory(simulation)
+
+        results['renderer.build_pyramid'] = measure(build_pyramid, self.repeat)
+        results['renderer.draw_full_trajectory'] = measure(lambda: renderer.draw_full_trajectory(simulation), self.repeat)
+        results['renderer.build_background'] = measure(lambda: renderer.build_background(simulation), self.repeat)
+        results['renderer.draw_current_position'] = measure(lambda: renderer.draw_current_position(simulation), self.repeat)
+        results['renderer.draw_fire_particles'] = measure(
+            lambda: renderer.draw_fire_particles(pos_x, pos_y, renderer.rocket_renderer.current_angle,
+                                                 current_data['Smoothed speed [m/s]'], current_data['Time [s]']),
+            self.repeat)
+        results['renderer.draw_info'] = measure(lambda: renderer.draw_info(current_data), self.repeat)
+        results['renderer.render'] = measure(lambda: renderer.render(simulation), self.repeat)
+
+        dashboard = Dashboard.from_spec(realtime=False)  # charts refresh on frame time
+        with_dashboard = Renderer(self.screen, self.width, self.height, seed=0, dashboard=dashboard)
+        with_dashboard.render(simulation)
+        # A flight second per frame: every chart scrolls and takes a new sample
+        speed = simulation.clock.speed
+        simulation.clock.set_speed(60.0)
+
+        def render_dashboard():
+            if simulation.clock.at_end():
+                simulation.seek(simulation.clock.start)
+            simulation.update()
+            with_dashboard.render(simulation)
+
+        results['renderer.render_dashboard'] = measure(render_dashboard, self.repeat)
+        simulation.clock.set_speed(speed)
+        simulation.seek(BENCH_TIME)
+        return results
+
+    def run_rotation(self):
+        rocket = RocketRenderer(ROCKET_IMAGE_PATH, initial_scale=0.5)
+        angles = iter(range(1 << 62))
+
+        def rotate_uncached():
+            rocket.rotation_cache.clear()
+            rocket.get_rotated_image(next(angles) % 360)
+
+        def rotate_cached():
+            rocket.get_rotated_image(next(angles) % 360)
+
+        vector = VectorRocketRenderer(ROCKET_SVG_PATH, initial_scale=0.5)
+
+        def render_vector():
+            vector.current_angle = next(angles) % 360
+            vector.render(self.screen, self.width // 2, self.height // 2)
+
+        rocket.warm_up()
+        return {
+            'rocket.rotate_uncached': measure(rotate_uncached, self.repeat),
+            'rocket.rotate_cached': measure(rotate_cached, self.repeat),
+            'rocket.vector_render': measure(render_vector, self.repeat),
+        }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(data_path, rows=DEFAULT_ROWS, repeat=5, log=print):
+    suite = BenchmarkSuite(repeat=repeat)
+    results = {}
+    for count in rows:
+        path = data_path if count == 0 else scaled_dataset(data_path, count)
+        row_count, timings = suite.run_dataset(path)
+        label = 'recorded' if count == 0 else f"{count}"
+        for name, timing in timings.items():
+            results[f"{label}/{name}"] = dict(timing, rows=row_count)
+            log(f"{label:>10} {name:<34} {format_seconds(timing['median_s'])}")
+    for name, timing in suite.run_rotation().items():
+        results[name] = timing
+        log(f"{'':>10} {name:<34} {format_seconds(timing['median_s'])}")
+    return {
+        'version': RESULTS_VERSION,
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, min_delta=MIN_DELTA):
+    # (name, baseline s, current s, ratio, regressed) for every benchmark in both runs
+    rows = []
+    for name, timing in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        before, after = base['median_s'], timing['median_s']
+        ratio = after / before if before > 0 else float('inf')
+        regressed = ratio > 1 + threshold and after - before > min_delta
+        rows.append((name, before, after, ratio, regressed))
+    return rows
+
+
+def format_seconds(seconds):
+    for unit, scale in (('s', 1.0), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.2f} ns"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Headless benchmarks for loading, simulation and rendering")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="run the suite and save the results as JSON")
+    run_parser.add_argument('data', nargs='?', default=DEFAULT_DATA_PATH, help="flight telemetry CSV")
+    run_parser.add_argument('--rows', default=','.join(str(r) for r in DEFAULT_ROWS),
+                            help="comma-separated synthetic dataset sizes; 0 is the recorded file")
+    run_parser.add_argument('--repeat', type=int, default=5, help="timed batches per benchmark")
+    run_parser.add_argument('--out', help="results file (default: benchmark-<revision>.json)")
+
+    compare_parser = commands.add_parser('compare', help="compare two result files")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help="fractional slowdown that counts as a regression")
+    compare_parser.add_argument('--min-delta', type=float, default=MIN_DELTA,
+                                help="ignore slowdowns smaller than this many seconds")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == 'run':
+        rows = [int(float(value)) for value in args.rows.split(',') if value]
+        report = run(args.data, rows, args.repeat)
+        out = args.out or f"benchmark-{report['meta']['revision'] or 'unknown'}.json"
+        with open(out, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"Saved {out}")
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    print(f"{baseline['meta']['revision']} -> {current['meta']['revision']}")
+    rows = compare(baseline, current, args.threshold, args.min_delta)
+    for name, before, after, ratio, regressed in rows:
+        flag = 'REGRESSION' if regressed else ''
+        print(f"{name:<46} {format_seconds(before)} {format_seconds(after)} {ratio:6.2f}x {flag}")
+    regressions = sum(row[4] for row in rows)
+    print(f"{regressions} regression(s) over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+import argparse
+import asyncio
+import socket
+import struct
+import sys
+import time
+import numpy as np
+
+DEFAULT_PORT = 7464
+DEFAULT_RESOLUTION = 1e-3  # quantization step, in each channel's own unit
+# Send-buffer bytes (kernel and transport each) a client may have queued
+# before it counts as slow; frames published meanwhile are then skipped
+MAX_BUFFERED = 4096
+
+# Every message is a little-endian u32 length followed by the payload. The
+# first payload on a connection is the header: MAGIC, version, channel count,
+# resolution and the newline-separated channel names. The rest are frames:
+#   u8 kind, u32 sequence, NaN bitmask,
+#   KEY:   every channel's quantized value as a zigzag varint
+#   DELTA: changed-channel bitmask, then varint differences for those channels
+# Channels that are NaN keep their last quantized value, so the bitmask alone
+# says which ones to show as missing.
+MAGIC = b'SHBC'
+VERSION = 1
+KEY, DELTA = 0, 1
+_LENGTH = struct.Struct('<I')
+_FRAME = struct.Struct('<BI')
+_HEADER = struct.Struct('<4sBHd')
+
+
+def _put_varint(out, value):
+    value = value * 2 if value >= 0 else -value * 2 - 1  # zigzag
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+    return (value >> 1) ^ -(value & 1), pos
+
+
+def _mask(flags):
+    return np.packbits(flags, bitorder='little').tobytes()
+
+
+def _unmask(data, pos, count):
+    size = (count + 7) // 8
+    flags = np.unpackbits(np.frombuffer(data, np.uint8, size, pos), count=count, bitorder='little').astype(bool)
+    return flags, pos + size
+
+
+def encode_header(names, resolution):
+    names = '\n'.join(names).encode()
+    return _HEADER.pack(MAGIC, VERSION, names.count(b'\n') + 1, resolution) + names
+
+
+def decode_header(payload):
+    magic, version, count, resolution = _HEADER.unpack_from(payload)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a telemetry broadcast (or an unsupported version)")
+    names = bytes(payload[_HEADER.size:]).decode().split('\n')
+    if len(names) != count:
+        raise ValueError(f"header lists {len(names)} channels, expected {count}")
+    return names, resolution
+
+
+class FrameEncoder:
+    # Quantizes each published state once and encodes it both as a key frame
+    # and as a delta against the previous state; every client gets one of
+    # the two, so the cost doesn't grow with the number of viewers
+    def __init__(self, count, resolution=DEFAULT_RESOLUTION):
+        self.count = count
+        self.resolution = resolution
+        self.previous = None
+        self.previous_nan = None
+        self.sequence = 0
+
+    def encode(self, values):
+        # (sequence, key frame, delta frame), or None if nothing changed
+        nan = ~np.isfinite(values)
+        quantized = np.round(np.where(nan, 0.0, values) / self.resolution).astype(np.int64)
+        if self.previous is not None:
+            quantized[nan] = self.previous[nan]
+            changed = quantized != self.previous
+            if not changed.any() and np.array_equal(nan, self.previous_nan):
+                return None
+        self.sequence += 1
+        nan_mask = _mask(nan)
+
+        key = bytearray(_FRAME.pack(KEY, self.sequence) + nan_mask)
+        for value in quantized.tolist():
+            _put_varint(key, value)
+        delta = None
+        if self.previous is not None:
+            delta = bytearray(_FRAME.pack(DELTA, self.sequence) + nan_mask + _mask(changed))
+            for value in (quantized - self.previous)[changed].tolist():
+                _put_varint(delta, value)
+            delta = bytes(delta)
+        self.previous, self.previous_nan = quantized, nan
+        return self.sequence, bytes(key), delta
+
+
+class FrameDecoder:
+    def __init__(self, count, resolution=DEFAULT_RESOLUTION):
+        self.count = count
+        self.resolution = resolution
+        self.state = None
+
+    def decode(self, payload):
+        # (sequence, values); None for a delta that arrives without a key frame
+        kind, sequence = _FRAME.unpack_from(payload)
+        nan, pos = _unmask(payload, _FRAME.size, self.count)
+        if kind == KEY:
+            state = np.empty(self.count, dtype=np.int64)
+            for i in range(self.count):
+                state[i], pos = _get_varint(payload, pos)
+            self.state = state
+        elif kind == DELTA:
+            if self.state is None:
+                return None
+            changed, pos = _unmask(payload, pos, self.count)
+            for i in np.flatnonzero(changed).tolist():
+                difference, pos = _get_varint(payload, pos)
+                self.state[i] += difference
+        else:
+            raise ValueError(f"unknown frame kind {kind}")
+        values = self.state * self.resolution
+        values[nan] = np.nan
+        return sequence, values
+
+
+class _Client:
+    __slots__ = ('writer', 'ready', 'last_sent', 'sent', 'dropped')
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.ready = asyncio.Event()
+        self.last_sent = None
+        self.sent = 0
+        self.dropped = 0
+
+
+class BroadcastServer:
+    # Publishes simulation snapshots to any number of TCP viewers. publish()
+    # encodes once and only wakes the per-client writers; each writer sends
+    # the newest frame when its socket has room, so a slow viewer skips
+    # frames (and resyncs from a key frame) instead of building a backlog.
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, resolution=DEFAULT_RESOLUTION):
+        self.host = host
+        self.port = port
+        self.resolution = resolution
+        self.clients = set()
+        self.encoder = None
+        self.header = None
+        self.frame = None
+        self.server = None
+        self.closing = False
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        # Wakes every writer so it can see `closing` and hang up
+        self.closing = True
+        for client in self.clients:
+            client.ready.set()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def publish(self, snapshot):
+        if self.encoder is None:
+            self.encoder = FrameEncoder(len(snapshot.schema), self.resolution)
+            self.header = encode_header(snapshot.schema.names, self.resolution)
+        frame = self.encoder.encode(snapshot.values)
+        if frame is None:
+            return
+        self.frame = frame
+        for client in self.clients:
+            client.ready.set()
+
+    async def _serve(self, reader, writer):
+        sock = writer.get_extra_info('socket')
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, MAX_BUFFERED)
+        writer.transport.set_write_buffer_limits(high=MAX_BUFFERED)
+        client = _Client(writer)
+        self.clients.add(client)
+        if self.frame is not None:
+            client.ready.set()
+        try:
+            while not writer.is_closing():
+                await client.ready.wait()
+                client.ready.clear()
+                if self.closing:
+                    break
+                sequence, key, delta = self.frame
+                if client.last_sent is None:
+                    writer.write(_LENGTH.pack(len(self.header)) + self.header)
+                if client.last_sent == sequence - 1 and delta is not None:
+                    payload = delta
+                else:
+                    payload = key
+                    if client.last_sent is not None:
+                        client.dropped += sequence - client.last_sent - 1
+                writer.write(_LENGTH.pack(len(payload)) + payload)
+                client.last_sent = sequence
+                client.sent += 1
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.clients.discard(client)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+
+def _read_message(file):
+    prefix = file.read(_LENGTH.size)
+    if len(prefix) < _LENGTH.size:
+        return None
+    (length,) = _LENGTH.unpack(prefix)
+    payload = file.read(length)
+    return payload if len(payload) == length else None
+
+
+def receive_frames(address, stop_event=None):
+    # Viewer side, in the shape TelemetryStream reads: the CSV header line,
+    # then one row of channel values per received frame. Connects before
+    # returning, so a refused connection raises in the caller rather than in
+    # whichever thread reads the frames; a server that goes away raises
+    # ConnectionError from the iteration.
+    sock = socket.create_connection(address)
+    return _frames(sock, address, stop_event)
+
+
+def _frames(sock, address, stop_event):
+    closed = f"{address[0]}:{address[1]} closed the connection"
+    with sock, sock.makefile('rb') as file:
+        header = _read_message(file)
+        if header is None:
+            raise ConnectionError(closed + " before sending a header")
+        names, resolution = decode_header(header)
+        decoder = FrameDecoder(len(names), resolution)
+        yield ','.join(names) + '\n'
+        while stop_event is None or not stop_event.is_set():
+            payload = _read_message(file)
+            if payload is None:
+                raise ConnectionError(closed)
+            frame = decoder.decode(payload)
+            if frame is not None:
+                yield frame[1]
+
+
+def parse_address(text, default_host='127.0.0.1'):
+    # "host:port", ":port" or "port"
+    host, _, port = text.rpartition(':')
+    return host or default_host, int(port)
+
+
+def watch(address, duration=None):
+    # Minimal viewer: prints the frame rate and the latest flight time
+    count, first, last_report = 0, None, time.perf_counter()
+    names = None
+    for row in receive_frames(address):
+        if isinstance(row, str):
+            names = row.strip().split(',')
+            continue
+        now = time.perf_counter()
+        first = first or now
+        count += 1
+        if now - last_report >= 1.0:
+            print(f"{count / (now - first):6.1f} frames/s  {names[0]} = {row[0]:.2f}")
+            last_report = now
+        if duration is not None and now - first >= duration:
+            break
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a simulation broadcast (start one with main.py --serve)")
+    parser.add_argument('address', nargs='?', default=f":{DEFAULT_PORT}", help="server as HOST:PORT")
+    parser.add_argument('--duration', type=float, help="stop after this many seconds")
+    args = parser.parse_args()
+    try:
+        watch(parse_address(args.address), args.duration)
+    except OSError as error:
+        print(error, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import numpy as np
+from physics import G0, standard_atmosphere
+
+FLIGHT_PATH_ANGLE = 'Flight path angle [deg]'
+JERK = 'Jerk [m/s^3]'
+AIR_DENSITY = 'Air density [kg/m^3]'
+HEATING_RATE = 'Heating rate proxy [kW/m^2]'
+GROUND_ENERGY = 'Ground-relative energy [MJ/kg]'
+
+# Sutton-Graves stagnation-point heating for Earth air [kg^0.5/m], evaluated
+# for a 1 m nose radius: only the shape of the curve matters for a proxy
+SUTTON_GRAVES_K = 1.7415e-4
+
+
+class ChannelDefinition:
+    def __init__(self, name, inputs, function):
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.function = function  # vectorized: one array per input -> array
+
+
+DERIVED_CHANNELS = {}
+
+
+def derived_channel(name, *inputs):
+    # Registers `function` as the definition of channel `name`. Inputs may be
+    # recorded channels or other derived channels.
+    def register(function):
+        DERIVED_CHANNELS[name] = ChannelDefinition(name, inputs, function)
+        return function
+    return register
+
+
+@derived_channel(FLIGHT_PATH_ANGLE, 'Horizontal speed [m/s]', 'Vertical speed [m/s]')
+def flight_path_angle(horizontal, vertical):
+    # Unwrapped, so interpolating across +-180 deg (coasting back over the
+    # top after boostback) doesn't swing through zero
+    return np.degrees(np.unwrap(np.arctan2(vertical, horizontal)))
+
+
+@derived_channel(JERK, 'Time [s]', 'Total acceleration [m/s^2]')
+def jerk(time, acceleration):
+    if len(time) < 2:
+        return np.zeros_like(acceleration)
+    return np.gradient(acceleration, time)
+
+
+@derived_channel(AIR_DENSITY, 'Smoothed altitude [km]')
+def air_density(altitude):
+    density, _ = standard_atmosphere(altitude * 1000)
+    return density
+
+
+@derived_channel(HEATING_RATE, AIR_DENSITY, 'Smoothed speed [m/s]')
+def heating_rate(density, speed):
+    return SUTTON_GRAVES_K * np.sqrt(density) * np.abs(speed) ** 3 / 1000
+
+
+@derived_channel(GROUND_ENERGY, 'Smoothed altitude [km]', 'Smoothed speed [m/s]')
+def ground_energy(altitude, speed):
+    return (G0 * altitude * 1000 + 0.5 * speed ** 2) / 1e6
+
+
+class DerivedChannels:
+    # Read-through view of a Telemetry: recorded channels come straight from
+    # its columns, derived ones are computed for the whole flight on first
+    # access and kept until one of their inputs is invalidated.
+    def __init__(self, telemetry=None, definitions=None):
+        self.telemetry = telemetry
+        self.definitions = DERIVED_CHANNELS if definitions is None else definitions
+        self.cache = {}
+        # Input channel -> derived channels that read it directly
+        self.dependents = {}
+        for definition in self.definitions.values():
+            for name in definition.inputs:
+                self.dependents.setdefault(name, set()).add(definition.name)
+
+    def __contains__(self, name):
+        return name in self.definitions or (self.telemetry is not None and name in self.telemetry.schema)
+
+    def names(self):
+        recorded = self.telemetry.schema.names if self.telemetry is not None else ()
+        return list(recorded) + [name for name in self.definitions if name not in recorded]
+
+    def __getitem__(self, name):
+        # A recorded channel always wins over a definition of the same name
+        if self.telemetry is not None and name in self.telemetry.schema:
+            return self.telemetry[name]
+        values = self.cache.get(name)
+        if values is None:
+            definition = self.definitions.get(name)
+            if definition is None or self.telemetry is None:
+                raise KeyError(name)
+            inputs = [self[input_name] for input_name in definition.inputs]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = np.asarray(definition.function(*inputs), dtype=np.float64)
+            values.flags.writeable = False
+            self.cache[name] = values
+        return values
+
+    def update(self, telemetry, changed=None):
+        # Switches to new data. `changed` lists the recorded channels that
+        # differ from the previous telemetry; by default all of them do.
+        self.telemetry = telemetry
+        if changed is None:
+            self.cache.clear()
+        else:
+            self.invalidate(*changed)
+
+    def invalidate(self, *names):
+        # Drops the named channels and everything derived from them
+        pending, seen = list(names), set()
+        while pending:
+            name = pending.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            self.cache.pop(name, None)
+            pending.extend(self.dependents.get(name, ()))
@@ -0,0 +1,68 @@
+import pygame
+from constants import BLACK, FLIGHT_COLORS
+from lod import TrajectoryPyramid
+from renderer import Renderer, INFO_FIELDS, INFO_VALUE_WIDTH, draw_pyramid
+from text_cache import TextCache, GlyphReadout
+
+COLUMN_GAP = 12
+
+
+class FlightTrackOverlay:
+    # A compared flight's full trajectory, drawn under the primary one
+    def __init__(self, telemetry, color, max_vertices):
+        self.pyramid = TrajectoryPyramid(telemetry['Downrange distance [km]'], telemetry['Smoothed altitude [km]'])
+        self.color = color
+        self.max_vertices = max_vertices
+
+    def draw(self, surface, viewport):
+        draw_pyramid(surface, viewport, self.pyramid, self.color, self.max_vertices)
+
+
+class ComparisonRenderer(Renderer):
+    # Renderer for a FlightComparison: the other flights' tracks are overlays
+    # sharing the primary's viewport, their current positions are markers,
+    # and the info panel shows one column of readouts per flight
+    def __init__(self, screen, width, height, comparison, **kwargs):
+        self.comparison = comparison
+        self.samples = []  # every flight's current sample, taken each frame
+        self.colors = [FLIGHT_COLORS[i % len(FLIGHT_COLORS)] for i in range(len(comparison.flights))]
+        super().__init__(screen, width, height, **kwargs)
+        for flight, color in zip(comparison.flights[1:], self.colors[1:]):
+            self.add_overlay(FlightTrackOverlay(flight.telemetry, color, self.max_vertices))
+
+    def layout_info(self):
+        self.flight_text = [TextCache(self.small_font, color) for color in self.colors]
+        labels = [f"{label} [{unit}]" if unit else label for label, _, unit in INFO_FIELDS]
+        self.info_labels = labels
+        value_x = 10 + max(self.text.render(label).get_width() for label in labels) + 4
+        column_width = self.atlas.cell_width * INFO_VALUE_WIDTH + COLUMN_GAP
+        self.column_x = [value_x + i * column_width for i in range(len(self.comparison.flights))]
+        # Row 0 holds the flight names
+        return [GlyphReadout(self.atlas, (x, 10 + (row + 1) * 20), INFO_VALUE_WIDTH)
+                for x in self.column_x for row in range(len(INFO_FIELDS))]
+
+    def draw_info(self, current_data):
+        rects = []
+        readouts = iter(self.info_readouts)
+        for sample in self.samples:
+            for (_, channel, _), readout in zip(INFO_FIELDS, readouts):
+                rects += readout.draw(self.screen, self.background, sample[channel])
+        return rects
+
+    def draw_info_labels(self, surface):
+        for row, label in enumerate(self.info_labels):
+            surface.blit(self.text.render(label), (10, 10 + (row + 1) * 20))
+        # Long names are cut at the column edge
+        name_area = pygame.Rect(0, 0, self.atlas.cell_width * INFO_VALUE_WIDTH, self.atlas.cell_height)
+        for x, flight, text in zip(self.column_x, self.comparison.flights, self.flight_text):
+            surface.blit(text.render(flight.name), (x, 10), name_area)
+
+    def draw_current_position(self, simulation):
+        # `simulation` is the comparison itself or a snapshot of it
+        self.samples = simulation.samples()
+        rects = super().draw_current_position(simulation)
+        for sample, color in zip(self.samples[1:], self.colors[1:]):
+            x, y = self.viewport.project(sample['Downrange distance [km]'], sample['Smoothed altitude [km]'])
+            rects.append(pygame.draw.circle(self.screen, color, (int(x), int(y)), 5))
+            pygame.draw.circle(self.screen, BLACK, (int(x), int(y)), 5, 1)
+        return rects
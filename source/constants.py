@@ -1,6 +1,31 @@
+import os
+
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 RED = (255, 0, 0)
 ORANGE = (255, 165, 0)
-BLUE = (0, 0, 255)
\ No newline at end of file
+BLUE = (0, 0, 255)
+
+# Trajectory colors of compared flights, in command-line order
+FLIGHT_COLORS = [BLUE, (0, 150, 0), (170, 0, 170), (0, 150, 150), ORANGE]
+
+# Reference event times (label, time [s]) of IFT3. Displayed events are
+# detected from each log (see events.py); these only calibrate the physics model.
+IFT3_EVENTS = [
+    ("Max Q", 60),
+    ("MECO", 60*2 + 42),
+    ("Stage sep", 60*2 + 48),
+    ("Boostback start", 60*2 + 54),
+    ("Boostback end", 60*3 + 48),
+    ("Gridfins live", 60*6 + 5),
+    ("Landing burn", 60*6 + 54),
+]
+
+# Paths
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(PROJECT_ROOT, 'assets', 'data')
+IMAGES_DIR = os.path.join(PROJECT_ROOT, 'assets', 'imgs')
+DEFAULT_DATA_PATH = os.path.join(DATA_DIR, 'IFT3_full_data_booster.csv')
+ROCKET_IMAGE_PATH = os.path.join(IMAGES_DIR, 'super_heavy_dark.png')
+ROCKET_SVG_PATH = os.path.join(IMAGES_DIR, 'super_heavy.svg')
\ No newline at end of file
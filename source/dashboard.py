@@ -0,0 +1,232 @@
+import time
+import numpy as np
+import pygame
+from constants import WHITE, BLACK, BLUE, RED, ORANGE, FLIGHT_COLORS
+from channels import JERK, HEATING_RATE, FLIGHT_PATH_ANGLE
+
+GRID_COLOR = (225, 225, 225)
+TITLE_HEIGHT = 16
+GUTTER = 44  # room for the y labels
+MARGIN = 4
+RANGE_PADDING = 0.05  # fraction of the data range added above and below
+DEFAULT_SPAN = 60.0  # seconds of flight shown
+DEFAULT_REFRESH_RATE = 30.0  # redraws per second of wall time
+COLUMN_FRACTION = 0.32  # share of the window width taken by the dashboard
+
+# Short names usable in a dashboard spec: name -> (channel, title)
+PANEL_PRESETS = {
+    'speed': ('Smoothed speed [m/s]', "Speed [m/s]"),
+    'mach': ('Mach number', "Mach"),
+    'q': ('Dynamic pressure [kPa]', "Dynamic pressure [kPa]"),
+    'accel': ('Total acceleration [m/s^2]', "Acceleration [m/s^2]"),
+    'altitude': ('Smoothed altitude [km]', "Altitude [km]"),
+    'vspeed': ('Vertical speed [m/s]', "Vertical speed [m/s]"),
+    'jerk': (JERK, "Jerk [m/s^3]"),
+    'heating': (HEATING_RATE, "Heating proxy [kW/m^2]"),
+    'fpa': (FLIGHT_PATH_ANGLE, "Flight path angle [deg]"),
+}
+DEFAULT_SPEC = 'speed,mach,q,accel'
+PANEL_COLORS = [BLUE, RED, ORANGE] + FLIGHT_COLORS[1:]
+
+
+class StripChart:
+    # One channel against flight time, kept in its own surface. A refresh
+    # scrolls the plot left by the time elapsed and draws only the samples
+    # that arrived since; the whole chart is redrawn only when time jumps
+    # (seek, reverse, resize) or a value leaves the current y range.
+    def __init__(self, channel, title, color=BLUE, span=DEFAULT_SPAN, refresh_rate=DEFAULT_REFRESH_RATE):
+        self.channel = channel
+        self.title = title
+        self.color = color
+        self.span = span
+        self.refresh_interval = 1 / refresh_rate
+        self.rect = None
+        self.surface = None
+        self.plot = None
+        self.last_refresh = None
+        self.invalidate()
+
+    def set_rect(self, rect):
+        self.rect = pygame.Rect(rect)
+        self.surface = pygame.Surface(self.rect.size)
+        plot_area = pygame.Rect(GUTTER, TITLE_HEIGHT, max(self.rect.width - GUTTER - MARGIN, 1),
+                                max(self.rect.height - TITLE_HEIGHT - MARGIN, 1))
+        self.plot = self.surface.subsurface(plot_area)
+        self.last_refresh = None  # the new surface is blank until drawn
+        self.invalidate()
+
+    def invalidate(self):
+        self.edge_time = None  # flight time at the plot's right edge
+        self.last_time = None  # time of the newest sample drawn
+        self.last_point = None  # its position, or None after a gap
+        self.y_range = None
+
+    def due(self, now):
+        return self.last_refresh is None or now - self.last_refresh >= self.refresh_interval - 1e-9
+
+    def update(self, simulation, text, now):
+        # Returns whether the surface changed
+        self.last_refresh = now
+        if self.channel not in simulation.channels:
+            return False
+        time = simulation.get_current_time()
+        pixels_per_second = self.plot.get_width() / self.span
+        if self.edge_time is not None:
+            shift = int((time - self.edge_time) * pixels_per_second)
+            if shift < 0 or time - self.edge_time > self.span:
+                self.invalidate()
+            elif shift == 0:
+                return False
+            elif self.append(simulation, shift, pixels_per_second):
+                return True
+            else:
+                self.invalidate()  # out of range: rescale
+        self.redraw(simulation, text, time, pixels_per_second)
+        return True
+
+    def _x(self, times, pixels_per_second):
+        return self.plot.get_width() - 1 - (self.edge_time - times) * pixels_per_second
+
+    def _y(self, values):
+        low, high = self.y_range
+        return (self.plot.get_height() - 1) * (high - values) / (high - low)
+
+    def _draw_grid(self, area):
+        height = self.plot.get_height()
+        for fraction in (0.25, 0.5, 0.75):
+            y = int((height - 1) * fraction)
+            pygame.draw.line(self.plot, GRID_COLOR, (area.left, y), (area.right - 1, y))
+
+    def _draw_runs(self, xs, ys):
+        # Connected segments of finite samples; NaNs leave gaps
+        finite = np.isfinite(ys)
+        if not finite.any():
+            return
+        breaks = np.flatnonzero(np.diff(finite.astype(np.int8))) + 1
+        for run_x, run_y, ok in zip(np.split(xs, breaks), np.split(ys, breaks), np.split(finite, breaks)):
+            if ok[0]:
+                points = np.column_stack((run_x, run_y)).tolist()
+                if len(points) == 1:
+                    points = points * 2
+                pygame.draw.aalines(self.plot, self.color, False, points)
+
+    def append(self, simulation, shift, pixels_per_second):
+        times = simulation.data['Time [s]']
+        first = int(np.searchsorted(times, self.last_time, side='right')) if self.last_time is not None else 0
+        self.edge_time += shift / pixels_per_second
+        last = int(np.searchsorted(times, self.edge_time, side='right'))
+        values = simulation.channels[self.channel][first:last]
+        finite = values[np.isfinite(values)]
+        if len(finite) and (finite.min() < self.y_range[0] or finite.max() > self.y_range[1]):
+            return False
+
+        width = self.plot.get_width()
+        shift = min(shift, width)
+        self.plot.scroll(-shift, 0)
+        strip = pygame.Rect(width - shift, 0, shift, self.plot.get_height())
+        self.plot.fill(WHITE, strip)
+        self._draw_grid(strip)
+        if last > first:
+            xs = self._x(times[first:last], pixels_per_second)
+            ys = self._y(values)
+            if self.last_point is not None:
+                # Continue the line from where the previous refresh ended
+                xs = np.concatenate(([self.last_point[0] - shift], xs))
+                ys = np.concatenate(([self.last_point[1]], ys))
+            self._draw_runs(xs, ys)
+            self.last_time = float(times[last - 1])
+            self.last_point = (float(xs[-1]), float(ys[-1])) if np.isfinite(ys[-1]) else None
+        elif self.last_point is not None:
+            self.last_point = (self.last_point[0] - shift, self.last_point[1])
+        return True
+
+    def redraw(self, simulation, text, time, pixels_per_second):
+        times = simulation.data['Time [s]']
+        channel = simulation.channels[self.channel]
+        # The range covers the whole flight (the buffered window, when
+        # streaming), so appending rarely rescales
+        low, high = simulation.stats.min(self.channel), simulation.stats.max(self.channel)
+        if not (np.isfinite(low) and np.isfinite(high)):
+            low, high = 0.0, 1.0
+        if high <= low:
+            low, high = low - 1.0, high + 1.0
+        padding = (high - low) * RANGE_PADDING
+        self.y_range = (float(low - padding), float(high + padding))
+
+        self.surface.fill(WHITE)
+        self.surface.blit(text.render(self.title), (GUTTER, 2))
+        frame = pygame.Rect(self.plot.get_abs_offset(), self.plot.get_size()).inflate(2, 2)
+        pygame.draw.rect(self.surface, BLACK, frame, 1)
+        top, bottom = text.render(f"{self.y_range[1]:.4g}"), text.render(f"{self.y_range[0]:.4g}")
+        self.surface.blit(top, (GUTTER - 4 - top.get_width(), TITLE_HEIGHT))
+        self.surface.blit(bottom, (GUTTER - 4 - bottom.get_width(), self.rect.height - MARGIN - bottom.get_height()))
+
+        self._draw_grid(self.plot.get_rect())
+        self.edge_time = time
+        first = int(np.searchsorted(times, time - self.span, side='left'))
+        last = int(np.searchsorted(times, time, side='right'))
+        self.last_time = self.last_point = None
+        if last > first:
+            xs = self._x(times[first:last], pixels_per_second)
+            ys = self._y(channel[first:last])
+            self._draw_runs(xs, ys)
+            self.last_time = float(times[last - 1])
+            if np.isfinite(ys[-1]):
+                self.last_point = (float(xs[-1]), float(ys[-1]))
+
+
+class Dashboard:
+    # A column of strip charts down the right side of the window. Charts
+    # refresh on their own schedules; one is only blitted to the screen when
+    # it changed or something was drawn over it. Schedules follow the wall
+    # clock, or with realtime=False the frame times passed to draw() (for
+    # exports and benchmarks, where frames don't run in real time).
+    def __init__(self, charts, column_fraction=COLUMN_FRACTION, realtime=True):
+        self.charts = charts
+        self.column_fraction = column_fraction
+        self.realtime = realtime
+        self.time = 0.0
+
+    @classmethod
+    def from_spec(cls, spec=DEFAULT_SPEC, span=DEFAULT_SPAN, realtime=True, channels=None):
+        # Comma-separated panels, each a preset name or a channel name,
+        # optionally with a refresh rate: "speed@60,mach,q@10". Given the
+        # flight's `channels`, a panel that names none of them is rejected
+        # here rather than left blank.
+        charts = []
+        for i, item in enumerate(part.strip() for part in spec.split(',') if part.strip()):
+            name, _, rate = item.partition('@')
+            channel, title = PANEL_PRESETS.get(name, (name, name))
+            if channels is not None and channel not in channels:
+                valid = [preset for preset, (target, _) in PANEL_PRESETS.items() if target in channels]
+                valid += [channel_name for channel_name in channels if channel_name != 'Time [s]']
+                raise ValueError(f"unknown dashboard panel {name!r}; expected one of {', '.join(valid)}")
+            try:
+                refresh_rate = float(rate) if rate else DEFAULT_REFRESH_RATE
+            except ValueError:
+                refresh_rate = None
+            if refresh_rate is None or not refresh_rate > 0:
+                raise ValueError(f"dashboard refresh rate must be a positive number of Hz, got {rate!r} in {item!r}")
+            charts.append(StripChart(channel, title, PANEL_COLORS[i % len(PANEL_COLORS)], span, refresh_rate))
+        return cls(charts, realtime=realtime)
+
+    def layout(self, width, height):
+        # Places the charts and returns the width left for the trajectory
+        column = int(width * self.column_fraction)
+        left = width - column
+        if self.charts:
+            height_each = height // len(self.charts)
+            for i, chart in enumerate(self.charts):
+                chart.set_rect((left, i * height_each, column - MARGIN, height_each))
+        return left
+
+    def draw(self, screen, simulation, text, dt, erased, full_redraw):
+        # `dt` is the frame time; `erased` are the screen areas restored from
+        # the background since the last frame
+        self.time = time.perf_counter() if self.realtime else self.time + dt
+        rects = []
+        for chart in self.charts:
+            changed = chart.due(self.time) and chart.update(simulation, text, self.time)
+            if changed or full_redraw or chart.rect.collidelist(erased) != -1:
+                rects.append(screen.blit(chart.surface, chart.rect))
+        return rects
@@ -1,13 +1,37 @@
 import csv
+import numpy as np
+from telemetry import Telemetry, TelemetrySchema
+from telemetry_cache import TelemetryCache, file_digest
 
 class DataLoader:
-    def __init__(self, file_path):
+    def __init__(self, file_path, use_cache=True, cache_dir=None):
         self.file_path = file_path
+        self.cache = TelemetryCache(cache_dir) if use_cache else None
 
     def load_data(self):
-        data = []
+        if self.cache is None:
+            return self.parse_csv()
+
+        digest = file_digest(self.file_path)
+        telemetry = self.cache.load(self.file_path, digest)
+        if telemetry is not None:
+            return telemetry
+
+        telemetry = self.parse_csv()
+        try:
+            self.cache.store(self.file_path, telemetry, digest)
+        except OSError:
+            pass  # A read-only cache location shouldn't prevent loading the flight
+        return telemetry
+
+    def parse_csv(self):
         with open(self.file_path, 'r') as file:
-            csv_reader = csv.DictReader(file)
-            for row in csv_reader:
-                data.append({k: float(v) if v else 0 for k, v in row.items()})
-        return data
\ No newline at end of file
+            header = next(csv.reader(file))
+        schema = TelemetrySchema(header)
+        try:
+            values = np.loadtxt(self.file_path, delimiter=',', skiprows=1, dtype=schema.dtype, ndmin=2)
+        except ValueError:
+            # Empty cells are treated as 0, same as the old row-by-row parser
+            values = np.genfromtxt(self.file_path, delimiter=',', skip_header=1, dtype=schema.dtype,
+                                   filling_values=0.0, ndmin=2)
+        return Telemetry(schema, values.T)
\ No newline at end of file
@@ -0,0 +1,37 @@
+import numpy as np
+import pygame
+from constants import ORANGE, RED
+
+BAND_ALPHA = 70
+
+
+class DispersionOverlay:
+    # Monte Carlo envelope drawn behind the recorded trajectory: the band
+    # between the low/high downrange percentiles at the median altitude, and
+    # one tick per landing point on the ground
+    def __init__(self, result, percentiles=(5, 95), color=ORANGE, marker_color=RED):
+        low, high, altitude = result.envelope(percentiles)
+        self.low = low.astype(np.float64)
+        self.high = high.astype(np.float64)
+        self.altitude = altitude.astype(np.float64)
+        landings = result.landing_downrange
+        self.landings = landings[~np.isnan(landings)]
+        self.color = color
+        self.marker_color = marker_color
+
+    def draw(self, surface, viewport):
+        xs = np.concatenate((self.low, self.high[::-1]))
+        ys = np.concatenate((self.altitude, self.altitude[::-1]))
+        px, py = viewport.project(xs, ys)
+        points = np.column_stack((px, py)).astype(int).tolist()
+        if len(points) >= 3:
+            # Alpha has to go through a layer: draw.polygon writes it as-is
+            band = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
+            pygame.draw.polygon(band, (*self.color, BAND_ALPHA), points)
+            surface.blit(band, (0, 0))
+
+        if len(self.landings):
+            mx, my = viewport.project(self.landings, np.zeros_like(self.landings))
+            # Every landing inside the same pixel column draws the same tick
+            for x in np.unique(mx.astype(int)):
+                pygame.draw.line(surface, self.marker_color, (int(x), int(my[0]) - 3), (int(x), int(my[0]) + 3))
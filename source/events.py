@@ -0,0 +1,130 @@
+import numpy as np
+
+MAX_Q = "Max Q"
+MECO = "MECO"
+STAGE_SEP = "Stage sep"
+BOOSTBACK_START = "Boostback start"
+BOOSTBACK_END = "Boostback end"
+GRIDFINS_LIVE = "Gridfins live"
+LANDING_BURN = "Landing burn"
+
+# Dynamic pressure at which the gridfins start to bite on the way down
+GRIDFIN_DYNAMIC_PRESSURE = 0.7  # kPa
+# A local acceleration minimum below this fraction of the peak so far is
+# the gap between engine cutoff and the boostback burn
+STAGING_ACCELERATION_FRACTION = 0.5
+# A maximum found in a partial (live) log only counts as a peak once a later
+# sample has come down below this fraction of it; until then it may just be
+# the newest sample
+PEAK_CONFIRM_FRACTION = 0.8
+
+
+class FlightEvents:
+    # Detected (label, time) pairs in time order; events that could not be
+    # found (e.g. not reached yet in a live stream) are left out
+    def __init__(self, events=()):
+        self.events = sorted(events, key=lambda event: event[1])
+        self._times = dict(self.events)
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def __len__(self):
+        return len(self.events)
+
+    def __contains__(self, label):
+        return label in self._times
+
+    def time(self, label, default=None):
+        return self._times.get(label, default)
+
+
+def _first(mask):
+    hits = np.flatnonzero(mask)
+    return int(hits[0]) if len(hits) else None
+
+
+def _arg(function, values, mask):
+    # np.argmax or np.argmin over the non-NaN samples in `mask`, as an index
+    # into the full arrays; None when there is nothing to look at
+    candidates = np.flatnonzero(mask & ~np.isnan(values))
+    if len(candidates) == 0:
+        return None
+    return int(candidates[function(values[candidates])])
+
+
+def _peaked(values, i, fraction=PEAK_CONFIRM_FRACTION):
+    return bool(np.any(values[i + 1:] < fraction * values[i]))
+
+
+def detect_events(telemetry):
+    # One vectorized pass over the whole log; every event is searched for in
+    # the window its predecessors leave, so the order is robust to noise
+    # from the other phases of flight.
+    times = np.asarray(telemetry['Time [s]'], dtype=np.float64)
+    n = len(times)
+    if n < 3:
+        return FlightEvents()
+    index = np.arange(n)
+    altitude = telemetry['Smoothed altitude [km]']
+    vertical_speed = telemetry['Vertical speed [m/s]']
+    horizontal_speed = telemetry['Horizontal speed [m/s]']
+    acceleration = telemetry['Total acceleration [m/s^2]']
+    dynamic_pressure = telemetry['Dynamic pressure [kPa]']
+
+    # Acceleration discontinuities show up as spikes in the jerk
+    dt = np.maximum(np.diff(times), 1e-9)
+    jerk = np.concatenate((np.diff(acceleration) / dt, [0.0]))
+
+    apogee = _arg(np.argmax, altitude, np.ones(n, dtype=bool))
+    if apogee is None:
+        # No altitude to go on (e.g. only NaNs received so far)
+        return FlightEvents()
+    ascent = (index <= apogee) & (vertical_speed > 0)
+    # Until the altitude has come down, the highest sample may be the newest
+    past_apogee = _peaked(altitude, apogee)
+    descent = (index > apogee) & past_apogee
+    events = {}
+
+    max_q = _arg(np.argmax, dynamic_pressure, ascent)
+    if max_q is not None and _peaked(dynamic_pressure, max_q):
+        events[MAX_Q] = max_q
+
+    # Engine cutoff leaves a deep dip in acceleration before boostback
+    after = index > (max_q or 0)
+    peak = np.maximum.accumulate(np.nan_to_num(acceleration))
+    local_min = np.zeros(n, dtype=bool)
+    local_min[1:-1] = (acceleration[1:-1] <= acceleration[:-2]) & (acceleration[1:-1] < acceleration[2:])
+    stage_sep = _first(local_min & after & (acceleration < STAGING_ACCELERATION_FRACTION * peak) & (index <= apogee))
+    if stage_sep is not None:
+        events[STAGE_SEP] = stage_sep
+        meco = _arg(np.argmin, jerk, after & (index < stage_sep))
+        if meco is not None:
+            events[MECO] = meco
+
+        # Boostback ends once the horizontal velocity has been reversed
+        boostback_end = _first((index > stage_sep) & (horizontal_speed < 0))
+        if boostback_end is not None:
+            events[BOOSTBACK_END] = boostback_end
+        burn = (index > stage_sep) & (index < (boostback_end if boostback_end is not None else apogee))
+        boostback_start = _arg(np.argmax, jerk, burn)
+        # The largest jerk is only known once the window has closed
+        if boostback_start is not None and (boostback_end is not None or past_apogee):
+            events[BOOSTBACK_START] = boostback_start
+
+    gridfins = _first(descent & (dynamic_pressure >= GRIDFIN_DYNAMIC_PRESSURE))
+    if gridfins is not None:
+        events[GRIDFINS_LIVE] = gridfins
+
+        # The landing burn is the largest step up in vertical deceleration
+        # after peak heating; it's read off the vertical speed because the
+        # logged acceleration channels are smoothed over the step
+        reentry_q = _arg(np.argmax, dynamic_pressure, descent)
+        vertical_acceleration = np.concatenate((np.diff(vertical_speed) / dt, [np.nan]))
+        step = np.concatenate(([np.nan], np.diff(vertical_acceleration)))
+        landing = _arg(np.argmax, step, index > max(reentry_q, gridfins))
+        # Confirmed once the burn has visibly slowed the descent
+        if landing is not None and _peaked(np.abs(vertical_speed), landing):
+            events[LANDING_BURN] = landing
+
+    return FlightEvents((label, float(times[i])) for label, i in events.items())
@@ -0,0 +1,187 @@
+import argparse
+import math
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Must be set before pygame creates a display, in the parent and in every worker
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from constants import DEFAULT_DATA_PATH
+from data_loader import DataLoader
+from renderer import Renderer
+from simulation import Simulation
+
+
+class ExportOptions:
+    def __init__(self, data_path, out_dir, image_format='png', fps=30, speed=1.0, start=None, end=None,
+                 width=1000, height=600, seed=0):
+        self.data_path = data_path
+        self.out_dir = out_dir
+        self.image_format = image_format
+        self.fps = fps
+        self.speed = speed
+        self.start = start
+        self.end = end
+        self.width = width
+        self.height = height
+        self.seed = seed
+
+
+class FrameExporter:
+    # Renders an arbitrary frame range. Each frame's particles are seeded by
+    # (seed, frame), and state that carries across frames (the separation
+    # flip and particles still in flight) is rebuilt by replaying the frames
+    # just before the range, so chunks rendered anywhere stitch seamlessly.
+    def __init__(self, options):
+        self.options = options
+        pygame.init()
+        self.screen = pygame.display.set_mode((options.width, options.height))
+        self.data = DataLoader(options.data_path).load_data()
+        self.simulation = Simulation(self.data)
+        clock = self.simulation.clock
+        self.start = clock.start if options.start is None else max(options.start, clock.start)
+        self.end = clock.end if options.end is None else min(options.end, clock.end)
+
+    def frame_count(self):
+        return int(math.floor((self.end - self.start) * self.options.fps / self.options.speed)) + 1
+
+    def frame_time(self, frame):
+        return self.start + frame * self.options.speed / self.options.fps
+
+    def _new_renderer(self):
+        renderer = Renderer(self.screen, self.options.width, self.options.height, frame_dt=1 / self.options.fps)
+        renderer.events = self.simulation.events
+        return renderer
+
+    def _prepare(self, renderer, first):
+        # Attitude only depends on what happened since separation
+        separation_time = renderer.stage_separation_time
+        if separation_time is None:
+            separation_time = self.end
+        separation_frame = max(0, math.ceil((separation_time - self.start) * self.options.fps / self.options.speed))
+        preroll = math.ceil(renderer.particles.lifetime_range[1] * self.options.fps) + 1
+        for frame in range(min(separation_frame, first), max(first - preroll, 0)):
+            self.simulation.seek(self.frame_time(frame))
+            renderer.update_attitude(self.simulation)
+        # Particles only live for a few frames, so render just those
+        for frame in range(max(first - preroll, 0), first):
+            self._render(renderer, frame)
+
+    def _render(self, renderer, frame):
+        self.simulation.seek(self.frame_time(frame))
+        renderer.reseed((self.options.seed, frame))
+        renderer.render(self.simulation)
+
+    def render_range(self, first, last):
+        renderer = self._new_renderer()
+        self._prepare(renderer, first)
+        out_dir = self.options.out_dir
+        if self.options.image_format == 'png':
+            outputs = []
+            for frame in range(first, last):
+                self._render(renderer, frame)
+                path = os.path.join(out_dir, f"frame_{frame:06d}.png")
+                pygame.image.save(self.screen, path)
+                outputs.append(path)
+            return outputs
+
+        path = os.path.join(out_dir, f"chunk_{first:06d}.rgb")
+        with open(path, 'wb') as file:
+            for frame in range(first, last):
+                self._render(renderer, frame)
+                file.write(pygame.image.tobytes(self.screen, 'RGB'))
+        return [path]
+
+
+_worker = None
+
+
+def _init_worker(options):
+    global _worker
+    _worker = FrameExporter(options)
+
+
+def _render_chunk(frame_range):
+    return _worker.render_range(*frame_range)
+
+
+def split_frames(count, chunk_size):
+    return [(first, min(first + chunk_size, count)) for first in range(0, count, chunk_size)]
+
+
+def export(options, workers=None, chunk_size=None):
+    os.makedirs(options.out_dir, exist_ok=True)
+    # Parse (and cache) the telemetry once up front so workers all hit the mmap cache
+    count = FrameExporter(options).frame_count()
+    workers = workers or os.cpu_count() or 1
+    # A few chunks per worker keeps the pool balanced without paying the
+    # preroll cost too often
+    chunk_size = chunk_size or max(1, math.ceil(count / (workers * 4)))
+    chunks = split_frames(count, chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(options,)) as pool:
+        outputs = [path for paths in pool.map(_render_chunk, chunks) for path in paths]
+
+    if options.image_format == 'raw':
+        raw_path = os.path.join(options.out_dir, 'frames.rgb')
+        with open(raw_path, 'wb') as target:
+            for path in outputs:
+                with open(path, 'rb') as source:
+                    shutil.copyfileobj(source, target)
+                os.remove(path)
+        outputs = [raw_path]
+    return count, outputs
+
+
+def encode_video(options, raw_path, video_path):
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg not found on PATH; the raw frames are in " + raw_path)
+    subprocess.run([
+        ffmpeg, '-y', '-loglevel', 'error',
+        '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f"{options.width}x{options.height}",
+        '-r', str(options.fps), '-i', raw_path,
+        '-pix_fmt', 'yuv420p', video_path,
+    ], check=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Render the simulation headlessly to a PNG sequence or raw video frames")
+    parser.add_argument('data', nargs='?', default=DEFAULT_DATA_PATH, help="flight telemetry CSV")
+    parser.add_argument('--out', required=True, help="output directory")
+    parser.add_argument('--format', choices=('png', 'raw'), default='png', help="PNG per frame or one raw RGB24 stream")
+    parser.add_argument('--video', metavar='PATH', help="also encode the raw frames with ffmpeg (implies --format raw)")
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--speed', type=float, default=1.0, help="flight seconds per second of video")
+    parser.add_argument('--start', type=float, help="first flight time to render [s]")
+    parser.add_argument('--end', type=float, help="last flight time to render [s]")
+    parser.add_argument('--size', default='1000x600', help="frame size as WIDTHxHEIGHT")
+    parser.add_argument('--workers', type=int, help="worker processes (default: all cores)")
+    parser.add_argument('--chunk-size', type=int, help="frames per task")
+    parser.add_argument('--seed', type=int, default=0, help="particle seed")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    width, height = (int(v) for v in args.size.lower().split('x'))
+    options = ExportOptions(args.data, args.out, 'raw' if args.video else args.format, args.fps, args.speed,
+                            args.start, args.end, width, height, args.seed)
+    started = time.perf_counter()
+    count, outputs = export(options, args.workers, args.chunk_size)
+    elapsed = time.perf_counter() - started
+    print(f"Rendered {count} frames in {elapsed:.1f} s ({count / elapsed:.1f} frames/s)")
+    if args.video:
+        encode_video(options, outputs[0], args.video)
+        print(f"Encoded {args.video}")
+    elif options.image_format == 'raw':
+        print(f"Raw RGB24 {width}x{height} @ {args.fps} fps: {outputs[0]}")
+
+
+if __name__ == "__main__":
+    main()
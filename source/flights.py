@@ -0,0 +1,113 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from data_loader import DataLoader
+from events import MAX_Q, MECO, STAGE_SEP, BOOSTBACK_START, BOOSTBACK_END, GRIDFINS_LIVE, LANDING_BURN
+from playback import PlaybackClock
+from simulation import Simulation
+from telemetry_cache import file_digest
+
+# Ways to line flights up: the flight time of the anchor in each log
+ANCHORS = {
+    'launch': lambda simulation: 0.0,
+    'apogee': lambda simulation: float(simulation.data['Time [s]'][simulation.stats.argmax('Smoothed altitude [km]')]),
+}
+# ...plus every detected event, e.g. 'stage-sep' or 'boostback-end'
+for _label in (MAX_Q, MECO, STAGE_SEP, BOOSTBACK_START, BOOSTBACK_END, GRIDFINS_LIVE, LANDING_BURN):
+    ANCHORS[_label.lower().replace(' ', '-')] = lambda simulation, label=_label: simulation.events.time(label)
+
+
+class Flight:
+    def __init__(self, name, telemetry, anchor=0.0):
+        self.name = name
+        self.telemetry = telemetry
+        self.anchor = anchor  # flight time [s] that lines up across flights
+
+
+def parse_flight_spec(spec):
+    # "path" or "path@time", the latter pinning the anchor to a flight time
+    path, _, anchor = spec.rpartition('@')
+    if path and not os.path.exists(spec):
+        try:
+            return path, float(anchor)
+        except ValueError:
+            pass
+    return spec, None
+
+
+def _load_in_worker(path):
+    # Parses into the shared on-disk cache so the parent can map it without
+    # copying; the telemetry itself only comes back if it couldn't be cached
+    loader = DataLoader(path)
+    digest = file_digest(path)
+    if loader.cache.load(path, digest) is not None:
+        return None
+    telemetry = loader.parse_csv()
+    try:
+        loader.cache.store(path, telemetry, digest)
+    except OSError:
+        return telemetry
+    return None
+
+
+def load_flights(paths, workers=None):
+    # Telemetry for every path, in order, parsed concurrently
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    if workers <= 1 or len(paths) == 1:
+        return [DataLoader(path).load_data() for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parsed = list(pool.map(_load_in_worker, paths))
+    return [telemetry if telemetry is not None else DataLoader(path).load_data()
+            for path, telemetry in zip(paths, parsed)]
+
+
+def load_comparison(specs, align='launch', workers=None, step=1 / 60, speed=1.0):
+    paths, pinned = zip(*(parse_flight_spec(spec) for spec in specs))
+    flights = []
+    for path, anchor, telemetry in zip(paths, pinned, load_flights(list(paths), workers)):
+        if anchor is None:
+            anchor = ANCHORS[align](Simulation(telemetry))
+            if anchor is None:
+                raise ValueError(f"{path}: no '{align}' event detected; pin the anchor with {path}@TIME")
+        flights.append(Flight(os.path.splitext(os.path.basename(path))[0], telemetry, anchor))
+    return FlightComparison(flights, step, speed)
+
+
+class FlightComparison(Simulation):
+    # Plays several flights against one clock. The clock runs on the first
+    # flight's time; every other flight is shown at the same offset from its
+    # own anchor. Axis bounds cover all flights and are computed once.
+    def __init__(self, flights, step=1 / 60, speed=1.0):
+        super().__init__(flights[0].telemetry, step, speed)
+        self.flights = flights
+        self.others = [Simulation(flight.telemetry, step) for flight in flights[1:]]
+        # Flight i's own time at clock time t is t + shifts[i]
+        self.shifts = [flight.anchor - flights[0].anchor for flight in flights]
+        simulations = [self] + self.others
+        start = min(sim.time_index.start - shift for sim, shift in zip(simulations, self.shifts))
+        end = max(sim.time_index.end - shift for sim, shift in zip(simulations, self.shifts))
+        self.clock = PlaybackClock(start, end, step, speed)
+        self.max_altitude = max(sim.stats.max('Smoothed altitude [km]') for sim in simulations)
+        self.max_downrange = max(sim.stats.max('Downrange distance [km]') for sim in simulations)
+        self._sync()
+
+    def update(self, real_dt=None):
+        super().update(real_dt)
+        self._sync()
+
+    def seek(self, time):
+        super().seek(time)
+        self._sync()
+
+    def _sync(self):
+        for simulation, shift in zip(self.others, self.shifts[1:]):
+            simulation.seek(self.clock.time + shift)
+
+    def samples(self):
+        # Current sample of every flight, in order
+        return [self.get_current_data()] + [simulation.get_current_data() for simulation in self.others]
+
+    def get_max_altitude(self):
+        return self.max_altitude
+
+    def get_max_downrange(self):
+        return self.max_downrange
@@ -0,0 +1,132 @@
+import numpy as np
+
+DEFAULT_MIN_POINTS = 256
+DEFAULT_FACTOR = 4
+
+
+def lttb(x, y, n_out):
+    # Largest-Triangle-Three-Buckets downsampling, returning indices of the
+    # kept points. Each bucket's triangle is anchored on the means of its
+    # neighbouring buckets instead of the previously chosen point, which
+    # makes buckets independent so the whole pass is vectorized.
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, counts = edges[:-1], np.diff(edges)
+    mean_x = np.add.reduceat(x[:n - 1], starts) / counts
+    mean_y = np.add.reduceat(y[:n - 1], starts) / counts
+
+    # Previous/next anchors, with the fixed end points at either side
+    prev_x = np.concatenate(([x[0]], mean_x[:-1]))
+    prev_y = np.concatenate(([y[0]], mean_y[:-1]))
+    next_x = np.concatenate((mean_x[1:], [x[-1]]))
+    next_y = np.concatenate((mean_y[1:], [y[-1]]))
+
+    bucket = np.repeat(np.arange(len(starts)), counts)
+    bx, by = x[1:n - 1], y[1:n - 1]
+    area = np.abs((prev_x[bucket] - next_x[bucket]) * (by - prev_y[bucket])
+                  - (prev_x[bucket] - bx) * (next_y[bucket] - prev_y[bucket]))
+
+    # First point reaching its bucket's max area
+    best = np.maximum.reduceat(area, starts - 1)
+    hits = np.flatnonzero(area == best[bucket])
+    chosen = hits[np.searchsorted(bucket[hits], np.arange(len(starts)))] + 1
+    return np.concatenate(([0], chosen, [n - 1]))
+
+
+class TrajectoryPyramid:
+    # Multi-resolution copies of a 2D curve. Level 0 is every sample; each
+    # further level keeps about 1/factor of the previous one, down to
+    # min_points. Levels are stored as indices into the original samples.
+    # Every level is reduced from the one below in chunks of
+    # min_points * factor points, and a chunk is kept once the points it
+    # covers are final, so extend() only reduces the newly appended tail.
+    def __init__(self, x, y, min_points=DEFAULT_MIN_POINTS, factor=DEFAULT_FACTOR, start=0):
+        self.min_points = min_points
+        self.factor = factor
+        self.chunk = min_points * factor
+        self.start = start  # absolute index of x[0]
+        self.x = np.empty(0)
+        self.y = np.empty(0)
+        # Per level above 0: absolute indices kept from the complete chunks
+        # of the level below, and the absolute index those chunks reach
+        self._sealed = []
+        self._sealed_until = []
+        self.levels = []
+        self.extend(x, y)
+
+    @property
+    def end(self):
+        return self.start + len(self.x)
+
+    def extend(self, x, y):
+        self.x = np.concatenate((self.x, np.asarray(x, dtype=np.float64)))
+        self.y = np.concatenate((self.y, np.asarray(y, dtype=np.float64)))
+        self._build()
+
+    def trim(self, start):
+        # Drops the samples before absolute index `start`
+        drop = min(max(start - self.start, 0), len(self.x))
+        if drop:
+            self.x, self.y = self.x[drop:], self.y[drop:]
+            self.start += drop
+            self._sealed = [sealed[np.searchsorted(sealed, self.start):] for sealed in self._sealed]
+            self._sealed_until = [max(until, self.start) for until in self._sealed_until]
+            self._build()
+
+    def _reduce(self, indices, n_out):
+        return indices[lttb(self.x[indices - self.start], self.y[indices - self.start], n_out)]
+
+    def _build(self):
+        final = below = np.arange(self.start, self.end)
+        self.levels = [below - self.start]
+        level = 0
+        while len(below) >= self.chunk:
+            if level == len(self._sealed):
+                self._sealed.append(np.empty(0, dtype=np.int64))
+                self._sealed_until.append(self.start)
+            pending = final[np.searchsorted(final, self._sealed_until[level]):]
+            complete = len(pending) // self.chunk * self.chunk
+            if complete:
+                chunks = pending[:complete].reshape(-1, self.chunk)
+                self._sealed[level] = np.concatenate([self._sealed[level]] +
+                                                     [self._reduce(chunk, self.min_points) for chunk in chunks])
+                self._sealed_until[level] = int(pending[complete - 1]) + 1
+            # The rest of the level below may still change, so it's reduced afresh
+            rest = below[np.searchsorted(below, self._sealed_until[level]):]
+            final = self._sealed[level]
+            below = np.concatenate((final, self._reduce(rest, len(rest) // self.factor)))
+            self.levels.append(below - self.start)
+            level += 1
+        del self._sealed[level:], self._sealed_until[level:]
+
+    def visible_runs(self, x0, x1, y0, y1, budget):
+        # Index runs of the finest level that fits `budget` vertices inside
+        # the window. Neighbours of visible points are kept so segments that
+        # cross the window edge are still drawn.
+        coarse = self.levels[-1]
+        fraction = max(np.count_nonzero(self._inside(coarse, x0, x1, y0, y1)), 1) / len(coarse)
+        level = len(self.levels) - 1
+        while level > 0 and len(self.levels[level - 1]) * fraction <= budget:
+            level -= 1
+
+        while True:
+            indices = self.levels[level]
+            inside = self._inside(indices, x0, x1, y0, y1)
+            mask = inside.copy()
+            mask[1:] |= inside[:-1]
+            mask[:-1] |= inside[1:]
+            if np.count_nonzero(mask) <= budget or level == len(self.levels) - 1:
+                break
+            level += 1
+
+        kept = np.flatnonzero(mask)
+        if len(kept) == 0:
+            return []
+        breaks = np.flatnonzero(np.diff(kept) > 1) + 1
+        return [indices[run] for run in np.split(kept, breaks)]
+
+    def _inside(self, indices, x0, x1, y0, y1):
+        x, y = self.x[indices], self.y[indices]
+        return (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
@@ -1,33 +1,188 @@
+import argparse
+import asyncio
+import functools
+import multiprocessing
+import os
+import sys
 import pygame
-from simulation import Simulation
+from simulation import Simulation, StreamingSimulation
 from renderer import Renderer
+from comparison_renderer import ComparisonRenderer
+from flights import ANCHORS, FlightComparison, load_comparison
 from data_loader import DataLoader
+from constants import DEFAULT_DATA_PATH
+from profiler import FrameProfiler, ProfilerHUD
+from runtime import Runtime
+from dashboard import Dashboard, DEFAULT_SPEC, PANEL_PRESETS
+from broadcast import BroadcastServer, parse_address, receive_frames
+from resampling import METHODS, SMOOTHERS, make_smoother, resample, smooth_channels
+from telemetry_stream import StreamError, TelemetryStream, follow_file, read_socket, DEFAULT_CAPACITY
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Super Heavy atmospheric reentry simulation")
+    parser.add_argument('data', nargs='*', default=[DEFAULT_DATA_PATH],
+                        help="flight telemetry CSV; several are overlaid (PATH@TIME pins a flight's anchor time)")
+    parser.add_argument('--align', choices=sorted(ANCHORS), default='launch',
+                        help="event the compared flights are lined up on")
+    parser.add_argument('--stream', metavar='SOURCE',
+                        help="follow live telemetry: a file to tail, '-' for stdin or host:port for a TCP socket")
+    parser.add_argument('--speed', type=float, default=1.0, help="playback speed multiplier (flight seconds per second)")
+    parser.add_argument('--view', metavar='HOST:PORT', help="watch a simulation broadcast by another instance's --serve")
+    parser.add_argument('--serve', metavar='[HOST:]PORT', help="broadcast the simulation state to viewers on this address")
+    parser.add_argument('--headless', action='store_true', help="with --serve, run without a window")
+    parser.add_argument('--buffer', type=int, default=DEFAULT_CAPACITY, help="samples kept in streaming mode")
+    parser.add_argument('--resample', type=float, metavar='HZ', help="interpolate the recorded flight to HZ samples per second")
+    parser.add_argument('--interpolation', choices=METHODS, default='linear', help="interpolation used by --resample")
+    parser.add_argument('--smooth', choices=SMOOTHERS, help="recompute the smoothed channels from the raw ones")
+    parser.add_argument('--dispersion', type=int, metavar='RUNS',
+                        help="overlay the landing dispersion envelope of a Monte Carlo study with RUNS runs")
+    parser.add_argument('--dashboard', nargs='?', const=DEFAULT_SPEC, metavar='PANELS',
+                        help="strip charts beside the trajectory, as comma-separated channels or presets "
+                             f"({', '.join(PANEL_PRESETS)}) with an optional @HZ refresh rate (default: {DEFAULT_SPEC})")
+    parser.add_argument('--vector-rocket', action='store_true', help="draw the booster from its SVG outline instead of the PNG sprite")
+    parser.add_argument('--profile', action='store_true', help="start with the profiler HUD shown (toggle with F3)")
+    parser.add_argument('--trace', metavar='PATH', help="on exit, write the profiled frames as Chrome trace-event JSON")
+    return parser.parse_args()
+
+def open_stream(source, capacity):
+    if source == '-':
+        lines = sys.stdin
+    elif ':' in source and not os.path.exists(source):
+        host, port = source.rsplit(':', 1)
+        lines = read_socket((host, int(port)))
+    else:
+        lines = follow_file(source)
+    return TelemetryStream(lines, capacity).start()
+
+SCRUB_STEP = 10  # seconds of flight time per arrow key press
+
+def handle_playback_key(key, simulation):
+    clock = simulation.clock
+    if clock is None:
+        return
+    if key == pygame.K_SPACE:
+        clock.toggle_pause()
+    elif key == pygame.K_r:
+        clock.reverse()
+    elif key == pygame.K_UP:
+        clock.set_speed(clock.speed * 2)
+    elif key == pygame.K_DOWN:
+        clock.set_speed(clock.speed / 2)
+    elif key == pygame.K_RIGHT:
+        simulation.seek(clock.time + SCRUB_STEP)
+    elif key == pygame.K_LEFT:
+        simulation.seek(clock.time - SCRUB_STEP)
+    elif pygame.K_1 <= key <= pygame.K_9:
+        events = simulation.events.events
+        if key - pygame.K_1 < len(events):
+            simulation.seek(events[key - pygame.K_1][1])
+
+ZOOM_STEP = 1.25  # per mouse wheel notch
+
+def handle_view_event(event, viewport):
+    if event.type == pygame.MOUSEWHEEL:
+        viewport.zoom(ZOOM_STEP ** event.y, pygame.mouse.get_pos())
+    elif event.type == pygame.MOUSEMOTION and event.buttons[0]:
+        viewport.pan(*event.rel)
+    elif event.type == pygame.KEYDOWN and event.key == pygame.K_HOME:
+        viewport.reset()
+
+def handle_event(event, simulation, renderer):
+    if event.type == pygame.VIDEORESIZE:
+        renderer.resize(event.w, event.h)
+    elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+        renderer.hud.toggle()
+    elif event.type == pygame.KEYDOWN:
+        handle_playback_key(event.key, simulation)
+    handle_view_event(event, renderer.viewport)
+
+async def run(runtime, serve=None):
+    server = None
+    if serve:
+        server = await BroadcastServer(*parse_address(serve)).start()
+        runtime.listeners.append(server.publish)
+        print(f"Broadcasting on {server.host}:{server.port}")
+    try:
+        await runtime.run()
+    finally:
+        if server is not None:
+            await server.close()
 
 def main():
-    pygame.init()
-    width, height = 1000, 600
-    screen = pygame.display.set_mode((width, height))
-    pygame.display.set_caption("Super Heavy Atmospheric Reentry - Real Data Simulation")
+    args = parse_args()
+    headless = args.headless and args.serve
+    profiler = FrameProfiler(enabled=args.profile or bool(args.trace))
+    if args.view:
+        try:
+            frames = receive_frames(parse_address(args.view))
+        except OSError as error:
+            print(f"Cannot connect to {args.view}: {error}", file=sys.stderr)
+            return 1
+        simulation = StreamingSimulation(TelemetryStream(frames, args.buffer).start())
+    elif args.stream:
+        simulation = StreamingSimulation(open_stream(args.stream, args.buffer))
+    elif len(args.data) > 1:
+        simulation = load_comparison(args.data, args.align, speed=args.speed)
+    else:
+        data_loader = DataLoader(args.data[0])
+        data = data_loader.load_data()
+        if args.smooth:
+            data = smooth_channels(data, make_smoother(args.smooth))
+        if args.resample:
+            data = resample(data, args.resample, args.interpolation)
+        simulation = Simulation(data, speed=args.speed)
 
-    data_loader = DataLoader('/home/luisgoc/workspace/super-heavy-simulation/assets/data/IFT3_full_data_booster.csv')
-    simulation = Simulation(data_loader.load_data())
-    renderer = Renderer(screen, width, height)
+    renderer = None
+    if not headless:
+        dashboard = None
+        if args.dashboard:
+            # A stream's channels aren't known until its header arrives
+            channels = simulation.channels.names() if simulation.data is not None else None
+            try:
+                dashboard = Dashboard.from_spec(args.dashboard, channels=channels)
+            except ValueError as error:
+                print(error, file=sys.stderr)
+                return 1
+        pygame.init()
+        width, height = 1000, 600
+        screen = pygame.display.set_mode((width, height), pygame.RESIZABLE)
+        pygame.display.set_caption("Super Heavy Atmospheric Reentry - Real Data Simulation")
+        options = dict(profiler=profiler, vector_rocket=args.vector_rocket, dashboard=dashboard)
+        if isinstance(simulation, FlightComparison):
+            renderer = ComparisonRenderer(screen, width, height, simulation, **options)
+        else:
+            renderer = Renderer(screen, width, height, **options)
+        renderer.hud = ProfilerHUD(profiler, renderer.small_font, visible=args.profile)
+    runtime = Runtime(simulation, renderer, profiler, on_event=lambda event: handle_event(event, simulation, renderer))
+    if args.dispersion and renderer is not None and not isinstance(simulation, StreamingSimulation):
+        from monte_carlo import run_dispersion
+        from dispersion_overlay import DispersionOverlay
 
-    running = True
-    clock = pygame.time.Clock()
+        def show_dispersion(result):
+            print(f"Dispersion: {result.count} runs at {result.runs_per_second:.0f} runs/s")
+            renderer.add_overlay(DispersionOverlay(result))
 
-    while running and not simulation.is_finished():
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
+        # The study runs in the background; the overlay appears when it's done.
+        # Its workers are spawned, not forked from this threaded process, and
+        # are terminated if the window closes first.
+        study = functools.partial(run_dispersion, mp_context=multiprocessing.get_context('spawn'),
+                                  cancel=runtime.cancelled)
+        runtime.offload(study, simulation.data, args.dispersion, then=show_dispersion)
 
-        simulation.update()
-        renderer.render(simulation)
+    status = 0
+    try:
+        asyncio.run(run(runtime, args.serve))
+    except StreamError as error:
+        print(error, file=sys.stderr)
+        status = 1
+    if isinstance(simulation, StreamingSimulation) and simulation.stream.skipped:
+        print(f"Skipped {simulation.stream.skipped} malformed telemetry lines", file=sys.stderr)
 
-        pygame.display.flip()
-        clock.tick(60)  # Increase to 60 FPS for smoother animation
+    if args.trace:
+        profiler.export_chrome_trace(args.trace)
 
     pygame.quit()
+    return status
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
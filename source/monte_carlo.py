@@ -0,0 +1,246 @@
+import argparse
+import copy
+import math
+import os
+import time
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+from constants import DEFAULT_DATA_PATH, IFT3_EVENTS
+from events import GRIDFINS_LIVE, STAGE_SEP, detect_events
+from physics import BoosterPhysics, ThrustPhase, VehicleParams, state_from_telemetry, thrust_phases
+
+DEFAULT_CHUNK_SIZE = 256
+CANCEL_POLL_INTERVAL = 0.05  # seconds between checks of the cancel event
+
+
+class DispersionConfig:
+    # 1-sigma perturbations around the nominal profile. `events` maps event
+    # labels to nominal times [s] and `start_time` defaults to its stage
+    # separation; by default both come from the flight being studied.
+    def __init__(self, boostback_duration_sigma=2.0, boostback_thrust_sigma=0.02, cd_scale_sigma=0.08,
+                 wind_sigma=10.0, gridfin_time_sigma=3.0, start_time=None, end_time=420.0,
+                 dt=0.1, grid_step=1.0, events=None):
+        self.boostback_duration_sigma = boostback_duration_sigma  # s
+        self.boostback_thrust_sigma = boostback_thrust_sigma  # fraction of nominal
+        self.cd_scale_sigma = cd_scale_sigma  # fraction of nominal
+        self.wind_sigma = wind_sigma  # m/s
+        self.gridfin_time_sigma = gridfin_time_sigma  # s
+        self.start_time = start_time
+        self.end_time = end_time
+        self.dt = dt
+        self.grid_step = grid_step  # spacing of the recorded trajectories [s]
+        self.events = events
+
+
+def nominal_events(telemetry):
+    # Event times detected from the log; IFT3's stand in for any the
+    # detector could not find
+    events = dict(IFT3_EVENTS)
+    events.update(detect_events(telemetry))
+    return events
+
+
+def sample_parameters(count, seed, config):
+    # Every run's perturbations come from one seeded generator, so results
+    # don't depend on how runs are split across workers
+    rng = np.random.default_rng(seed)
+    return {
+        'boostback_duration': rng.normal(0.0, config.boostback_duration_sigma, count),
+        'boostback_thrust': 1.0 + rng.normal(0.0, config.boostback_thrust_sigma, count),
+        'cd_scale': 1.0 + rng.normal(0.0, config.cd_scale_sigma, count),
+        'wind': rng.normal(0.0, config.wind_sigma, count),
+        'gridfin_time': config.events[GRIDFINS_LIVE] + rng.normal(0.0, config.gridfin_time_sigma, count),
+    }
+
+
+def build_params(samples, events):
+    phases = []
+    for phase in thrust_phases(events):
+        if phase.mode == 'boostback':
+            phase = ThrustPhase(phase.name, phase.start, phase.end + samples['boostback_duration'],
+                                phase.thrust * samples['boostback_thrust'], phase.isp, phase.mode)
+        phases.append(phase)
+    return VehicleParams(cd_scale=samples['cd_scale'], wind=samples['wind'],
+                         gridfin_time=samples['gridfin_time'], phases=tuple(phases))
+
+
+# name -> (shape, dtype) of the shared result arrays
+def result_layout(count, steps):
+    return {
+        'landing_downrange': ((count,), np.float64),
+        'landing_speed': ((count,), np.float64),
+        'landing_time': ((count,), np.float64),
+        'max_q': ((count,), np.float64),
+        'max_q_time': ((count,), np.float64),
+        'downrange': ((count, steps), np.float32),
+        'altitude': ((count, steps), np.float32),
+    }
+
+
+_worker = {}
+
+
+def _attach(names, layout):
+    arrays, blocks = {}, []
+    for key, (shape, dtype) in layout.items():
+        block = shared_memory.SharedMemory(name=names[key])
+        blocks.append(block)
+        arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    return arrays, blocks
+
+
+def _init_worker(names, layout, initial_state, config):
+    _worker['arrays'], _worker['blocks'] = _attach(names, layout)
+    _worker['initial_state'] = initial_state
+    _worker['config'] = config
+
+
+def _run_chunk(task):
+    first, samples = task
+    arrays, config = _worker['arrays'], _worker['config']
+    count = len(samples['cd_scale'])
+    state = np.repeat(_worker['initial_state'][:, None], count, axis=1)
+    physics = BoosterPhysics(build_params(samples, config.events), state, config.start_time)
+    _, states = physics.run(config.end_time, config.dt, config.grid_step)
+
+    # Runs that all landed early stop recording; pad with the final state
+    steps = arrays['downrange'].shape[1]
+    states = states[:steps]
+    if len(states) < steps:
+        states = np.concatenate((states, np.repeat(states[-1:], steps - len(states), axis=0)))
+
+    chunk = slice(first, first + count)
+    arrays['landing_downrange'][chunk] = np.where(physics.landed, physics.state[0], np.nan) / 1000.0
+    arrays['landing_speed'][chunk] = physics.landing_speed
+    arrays['landing_time'][chunk] = physics.landing_time
+    arrays['max_q'][chunk] = physics.max_q / 1000.0
+    arrays['max_q_time'][chunk] = physics.max_q_time
+    arrays['downrange'][chunk] = states[:, 0, :].T / 1000.0
+    arrays['altitude'][chunk] = states[:, 1, :].T / 1000.0
+    return count
+
+
+class DispersionResult:
+    PERCENTILES = (5, 50, 95)
+
+    def __init__(self, times, arrays, samples, elapsed):
+        self.times = times
+        self.samples = samples
+        self.elapsed = elapsed
+        for key, value in arrays.items():
+            setattr(self, key, value)
+
+    @property
+    def count(self):
+        return len(self.landing_downrange)
+
+    @property
+    def runs_per_second(self):
+        return self.count / self.elapsed
+
+    def footprint(self):
+        # Landing statistics over the runs that reached the ground
+        landed = ~np.isnan(self.landing_downrange)
+        points = np.column_stack((self.landing_downrange, self.landing_speed, self.landing_time))[landed]
+        return {
+            'landed': int(landed.sum()),
+            'channels': ('landing downrange [km]', 'landing speed [m/s]', 'landing time [s]'),
+            'mean': points.mean(axis=0),
+            'covariance': np.cov(points, rowvar=False) if len(points) > 1 else np.zeros((3, 3)),
+            'downrange_percentiles': np.percentile(points[:, 0], self.PERCENTILES) if len(points) else None,
+        }
+
+    def max_q_distribution(self, bins=30):
+        counts, edges = np.histogram(self.max_q, bins=bins)
+        return {
+            'mean_kpa': float(self.max_q.mean()),
+            'percentiles_kpa': np.percentile(self.max_q, self.PERCENTILES),
+            'histogram': (counts, edges),
+        }
+
+    def envelope(self, percentiles=(5, 95)):
+        # Per time step: low/high downrange percentiles at the median altitude
+        low, high = np.percentile(self.downrange, percentiles, axis=0)
+        return low, high, np.median(self.altitude, axis=0)
+
+
+def run_dispersion(telemetry, count, seed=0, config=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                   mp_context=None, cancel=None):
+    # `mp_context` picks how workers start: callers with threads running
+    # should pass multiprocessing.get_context('spawn'), since forking a
+    # threaded process is unsafe. Setting the `cancel` event (any object with
+    # is_set()) terminates the workers; the study then returns None.
+    # A copy, since start_time is snapped to the nearest recorded sample
+    config = copy.copy(config or DispersionConfig())
+    if config.events is None:
+        config.events = nominal_events(telemetry)
+    if config.start_time is None:
+        config.start_time = config.events[STAGE_SEP]
+    nominal = VehicleParams()
+    config.start_time, initial_state = state_from_telemetry(telemetry, config.start_time, nominal.separation_mass)
+    initial_state = initial_state[:, 0]
+    steps = int(math.floor((config.end_time - config.start_time) / config.grid_step)) + 1
+    times = config.start_time + np.arange(steps) * config.grid_step
+
+    samples = sample_parameters(count, seed, config)
+    tasks = [(first, {key: value[first:first + chunk_size] for key, value in samples.items()})
+             for first in range(0, count, chunk_size)]
+
+    layout = result_layout(count, steps)
+    blocks = {key: shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize))
+              for key, (shape, dtype) in layout.items()}
+    try:
+        names = {key: block.name for key, block in blocks.items()}
+        started = time.perf_counter()
+        context = mp_context or multiprocessing.get_context()
+        # Leaving the with block terminates the workers, cancelled or not
+        with context.Pool(workers or os.cpu_count() or 1, _init_worker, (names, layout, initial_state, config)) as pool:
+            done = pool.map_async(_run_chunk, tasks)
+            while not done.ready():
+                if cancel is not None and cancel.is_set():
+                    return None
+                done.wait(CANCEL_POLL_INTERVAL)
+            done.get()  # re-raises a worker's exception
+        elapsed = time.perf_counter() - started
+        arrays = {key: np.ndarray(shape, dtype=dtype, buffer=blocks[key].buf).copy()
+                  for key, (shape, dtype) in layout.items()}
+    finally:
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+    return DispersionResult(times, arrays, samples, elapsed)
+
+
+def main():
+    from data_loader import DataLoader
+
+    parser = argparse.ArgumentParser(description="Landing dispersion study around the recorded booster profile")
+    parser.add_argument('data', nargs='?', default=DEFAULT_DATA_PATH, help="flight telemetry CSV")
+    parser.add_argument('--runs', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, help="worker processes (default: all cores)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="runs per task")
+    parser.add_argument('--save', metavar='PATH', help="write per-run results to an .npz file")
+    args = parser.parse_args()
+
+    result = run_dispersion(DataLoader(args.data).load_data(), args.runs, args.seed,
+                            workers=args.workers, chunk_size=args.chunk_size)
+    footprint = result.footprint()
+    max_q = result.max_q_distribution()
+    print(f"{result.count} runs in {result.elapsed:.1f} s ({result.runs_per_second:.0f} runs/s)")
+    print(f"Landed: {footprint['landed']}")
+    for name, mean in zip(footprint['channels'], footprint['mean']):
+        print(f"  mean {name}: {mean:.2f}")
+    print("  covariance:\n" + np.array2string(footprint['covariance'], precision=3))
+    if footprint['downrange_percentiles'] is not None:
+        print("  downrange p5/p50/p95 [km]: " + " / ".join(f"{v:.2f}" for v in footprint['downrange_percentiles']))
+    print(f"Max Q mean {max_q['mean_kpa']:.1f} kPa, p5/p50/p95 "
+          + " / ".join(f"{v:.1f}" for v in max_q['percentiles_kpa']))
+    if args.save:
+        np.savez(args.save, times=result.times, **{key: getattr(result, key) for key in result_layout(0, 0)},
+                 **{'sample_' + key: value for key, value in result.samples.items()})
+
+
+if __name__ == "__main__":
+    main()
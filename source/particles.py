@@ -0,0 +1,85 @@
+import numpy as np
+import pygame
+from constants import RED, ORANGE
+
+
+class ParticleSystem:
+    def __init__(self, max_particles=2048, colors=(RED, ORANGE), sizes=(1, 2, 3), lifetime=(0.1, 0.3), seed=None):
+        self.max_particles = max_particles
+        self.lifetime_range = lifetime
+        self.colors = colors
+        self.sizes = np.array(sizes)
+        self.rng = np.random.default_rng(seed)
+        # Live particles always occupy the first `count` slots
+        self.count = 0
+        self.position = np.zeros((max_particles, 2))
+        self.velocity = np.zeros((max_particles, 2))
+        self.age = np.zeros(max_particles)
+        self.lifetime = np.zeros(max_particles)
+        self.color_index = np.zeros(max_particles, dtype=np.int8)
+        self.size_index = np.zeros(max_particles, dtype=np.int8)
+        self.sprites = [[self._make_sprite(color, size) for size in sizes] for color in colors]
+
+    @staticmethod
+    def _make_sprite(color, radius):
+        sprite = pygame.Surface((radius * 2 + 1, radius * 2 + 1), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, color, (radius, radius), radius)
+        return sprite
+
+    @property
+    def mean_lifetime(self):
+        return sum(self.lifetime_range) / 2
+
+    def reseed(self, seed):
+        self.rng = np.random.default_rng(seed)
+
+    def clear(self):
+        self.count = 0
+
+    def emit(self, n, x, y, angle, spread=30, offset=(20, 40), speed=(60, 180)):
+        # Spawns up to `n` particles behind a nozzle at (x, y); `angle` is the
+        # vehicle attitude in degrees, same convention as RocketRenderer
+        n = min(int(n), self.max_particles - self.count)
+        if n <= 0:
+            return 0
+        rng = self.rng
+        new = slice(self.count, self.count + n)
+        theta = np.radians(angle + rng.uniform(-spread, spread, n))
+        direction = np.column_stack((-np.sin(theta), np.cos(theta)))
+        self.position[new] = (x, y) + direction * rng.uniform(*offset, n)[:, None]
+        self.velocity[new] = direction * rng.uniform(*speed, n)[:, None]
+        self.age[new] = 0
+        self.lifetime[new] = rng.uniform(*self.lifetime_range, n)
+        self.color_index[new] = rng.integers(0, len(self.colors), n)
+        self.size_index[new] = rng.integers(0, len(self.sizes), n)
+        self.count += n
+        return n
+
+    def update(self, dt):
+        live = slice(0, self.count)
+        self.position[live] += self.velocity[live] * dt
+        self.age[live] += dt
+        alive = self.age[live] < self.lifetime[live]
+        remaining = int(alive.sum())
+        if remaining < self.count:
+            for array in (self.position, self.velocity, self.age, self.lifetime, self.color_index, self.size_index):
+                array[:remaining] = array[live][alive]
+            self.count = remaining
+
+    def draw(self, surface):
+        # Returns the rect covering every particle drawn, or None
+        if self.count == 0:
+            return None
+        live = slice(0, self.count)
+        radius = self.sizes[self.size_index[live]]
+        corner = self.position[live].astype(int) - radius[:, None]
+        sprites = self.sprites
+        surface.blits(
+            [(sprites[c][s], (px, py)) for c, s, (px, py) in
+             zip(self.color_index[live].tolist(), self.size_index[live].tolist(), corner.tolist())],
+            doreturn=False,
+        )
+        extent = 2 * int(self.sizes.max()) + 1
+        left, top = corner.min(axis=0)
+        right, bottom = corner.max(axis=0) + extent
+        return pygame.Rect(int(left), int(top), int(right - left), int(bottom - top)).clip(surface.get_rect())
@@ -0,0 +1,267 @@
+import numpy as np
+from constants import IFT3_EVENTS
+
+G0 = 9.80665  # m/s^2
+EARTH_RADIUS = 6371e3  # m
+AIR_GAS_CONSTANT = 287.053  # J/(kg K)
+AIR_GAMMA = 1.4
+
+# U.S. Standard Atmosphere 1976 up to 86 km: base altitude [m], base
+# temperature [K], lapse rate [K/m], base pressure [Pa]. Above the last
+# layer the atmosphere is extended isothermally.
+_ATMOSPHERE_LAYERS = np.array([
+    (0.0, 288.15, -0.0065, 101325.0),
+    (11000.0, 216.65, 0.0, 22632.06),
+    (20000.0, 216.65, 0.001, 5474.889),
+    (32000.0, 228.65, 0.0028, 868.0187),
+    (47000.0, 270.65, 0.0, 110.9063),
+    (51000.0, 270.65, -0.0028, 66.93887),
+    (71000.0, 214.65, -0.002, 3.956420),
+    (86000.0, 186.87, 0.0, 0.3733836),
+])
+
+
+def standard_atmosphere(altitude):
+    # Returns (density [kg/m^3], speed of sound [m/s]) for altitudes in metres
+    h = np.clip(np.asarray(altitude, dtype=np.float64), 0.0, None)
+    layer = np.searchsorted(_ATMOSPHERE_LAYERS[:, 0], h, side='right') - 1
+    base, base_temperature, lapse, base_pressure = _ATMOSPHERE_LAYERS[layer].T
+    dh = h - base
+    temperature = base_temperature + lapse * dh
+    exponent = G0 / (AIR_GAS_CONSTANT * np.where(lapse == 0, 1.0, lapse))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gradient = base_pressure * (temperature / base_temperature) ** -exponent
+    isothermal = base_pressure * np.exp(-G0 * dh / (AIR_GAS_CONSTANT * base_temperature))
+    pressure = np.where(lapse == 0, isothermal, gradient)
+    density = pressure / (AIR_GAS_CONSTANT * temperature)
+    speed_of_sound = np.sqrt(AIR_GAMMA * AIR_GAS_CONSTANT * temperature)
+    return density, speed_of_sound
+
+
+def gravity(altitude):
+    return G0 * (EARTH_RADIUS / (EARTH_RADIUS + altitude)) ** 2
+
+
+class ThrustPhase:
+    # `start`, `end` and `thrust` may be scalars or one value per trajectory.
+    # mode is 'ascent' (pitch program), 'boostback' (thrust back towards the
+    # launch site) or 'retrograde' (against the airspeed vector).
+    def __init__(self, name, start, end, thrust, isp, mode):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.thrust = thrust
+        self.isp = isp
+        self.mode = mode
+
+
+_EVENTS = dict(IFT3_EVENTS)
+
+
+def thrust_phases(events):
+    # The booster's burns, timed from a label -> time [s] mapping of events
+    return (
+        ThrustPhase("Ascent", 0.0, events["MECO"], 6.1e7, 340.0, 'ascent'),
+        ThrustPhase("Boostback", events["Boostback start"], events["Boostback end"], 2.05e7, 330.0, 'boostback'),
+        ThrustPhase("Landing burn", events["Landing burn"], events["Landing burn"] + 30.0, 1.6e7, 330.0, 'retrograde'),
+    )
+
+
+DEFAULT_PHASES = thrust_phases(_EVENTS)
+
+# Transonic drag rise for a blunt, engines-first booster
+DEFAULT_MACH_TABLE = (0.0, 0.6, 0.9, 1.1, 1.4, 2.0, 3.0, 5.0, 10.0)
+DEFAULT_CD_TABLE = (0.55, 0.6, 0.85, 1.15, 1.2, 1.1, 1.0, 0.95, 0.95)
+
+
+class VehicleParams:
+    def __init__(self,
+                 dry_mass=2.75e5,
+                 liftoff_mass=5.0e6,
+                 separation_mass=9.0e5,
+                 separation_time=_EVENTS["Stage sep"],
+                 reference_area=63.6,
+                 mach_table=DEFAULT_MACH_TABLE,
+                 cd_table=DEFAULT_CD_TABLE,
+                 cd_scale=1.0,
+                 gridfin_time=_EVENTS["Gridfins live"],
+                 gridfin_cd_factor=2.5,
+                 wind=0.0,
+                 boostback_elevation=4.0,
+                 ascent_pitch=((0, 0), (20, 2), (40, 15), (60, 15), (90, 26), (120, 44), (150, 62), (162, 68)),
+                 phases=DEFAULT_PHASES):
+        self.dry_mass = dry_mass
+        self.liftoff_mass = liftoff_mass
+        self.separation_mass = separation_mass  # booster only, ship gone
+        self.separation_time = separation_time
+        self.reference_area = reference_area  # 9 m diameter
+        self.mach_table = np.asarray(mach_table, dtype=np.float64)
+        self.cd_table = np.asarray(cd_table, dtype=np.float64)
+        self.cd_scale = cd_scale  # scalar or per trajectory, like gridfin_time and wind
+        self.gridfin_time = gridfin_time
+        self.gridfin_cd_factor = gridfin_cd_factor
+        self.wind = wind  # horizontal wind [m/s], positive downrange
+        self.boostback_elevation = boostback_elevation  # thrust angle above the horizon [deg]
+        # (time [s], pitch from vertical [deg]) during the ascent burn
+        self.ascent_pitch = np.asarray(ascent_pitch, dtype=np.float64)
+        self.phases = phases
+
+
+class BoosterPhysics:
+    # Point-mass booster over a flat downrange/altitude plane, integrated
+    # with classic RK4. The state holds one column per trajectory so any
+    # number of vehicles advance in the same numpy operations:
+    #   [downrange m, altitude m, horizontal speed m/s, vertical speed m/s, mass kg]
+    def __init__(self, params, state, time=0.0):
+        self.params = params
+        self.state = np.array(state, dtype=np.float64).reshape(5, -1)
+        self.time = time
+        self.landed = np.zeros(self.count, dtype=bool)
+        self.max_q = np.zeros(self.count)
+        self.max_q_time = np.full(self.count, time)
+        self.landing_time = np.full(self.count, np.nan)
+        self.landing_speed = np.full(self.count, np.nan)
+
+    @property
+    def count(self):
+        return self.state.shape[1]
+
+    def dynamic_pressure(self, state=None):
+        x, h, vx, vh, m = self.state if state is None else state
+        density, _ = standard_atmosphere(h)
+        return 0.5 * density * ((vx - self.params.wind) ** 2 + vh ** 2)
+
+    def derivatives(self, t, state):
+        params = self.params
+        x, h, vx, vh, m = state
+        air_vx, air_vh = vx - params.wind, vh
+        airspeed = np.hypot(air_vx, air_vh)
+        density, speed_of_sound = standard_atmosphere(h)
+
+        cd = np.interp(airspeed / speed_of_sound, params.mach_table, params.cd_table) * params.cd_scale
+        cd = np.where(t >= params.gridfin_time, cd * params.gridfin_cd_factor, cd)
+        drag = 0.5 * density * airspeed * cd * params.reference_area / m
+        ax = -drag * air_vx
+        ah = -drag * air_vh - gravity(h)
+        dm = np.zeros_like(m)
+
+        has_propellant = m > params.dry_mass
+        for phase in params.phases:
+            active = (t >= phase.start) & (t < phase.end) & has_propellant
+            if not np.any(active):
+                continue
+            thrust = np.where(active, phase.thrust, 0.0)
+            if phase.mode == 'ascent':
+                pitch = np.radians(np.interp(t, params.ascent_pitch[:, 0], params.ascent_pitch[:, 1]))
+                direction_x, direction_h = np.sin(pitch), np.cos(pitch)
+            elif phase.mode == 'boostback':
+                elevation = np.radians(params.boostback_elevation)
+                direction_x, direction_h = -np.cos(elevation), np.sin(elevation)
+            else:
+                safe_speed = np.where(airspeed > 1e-6, airspeed, 1.0)
+                direction_x, direction_h = -air_vx / safe_speed, -air_vh / safe_speed
+            ax = ax + thrust * direction_x / m
+            ah = ah + thrust * direction_h / m
+            dm = dm - thrust / (phase.isp * G0)
+
+        return np.array([vx, vh, ax, ah, dm])
+
+    def step(self, dt):
+        t, y = self.time, self.state
+        k1 = self.derivatives(t, y)
+        k2 = self.derivatives(t + dt / 2, y + dt / 2 * k1)
+        k3 = self.derivatives(t + dt / 2, y + dt / 2 * k2)
+        k4 = self.derivatives(t + dt, y + dt * k3)
+        new_state = y + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+        if t < self.params.separation_time <= t + dt:
+            # The ship leaves; whatever mass is above the booster's goes with it
+            new_state[4] = np.minimum(new_state[4], self.params.separation_mass)
+
+        # Vehicles on the ground stay where they touched down
+        new_state = np.where(self.landed, y, new_state)
+        touchdown = (new_state[1] <= 0.0) & (new_state[3] < 0.0) & ~self.landed
+        new_state[1] = np.maximum(new_state[1], 0.0)
+        self.landing_time[touchdown] = t + dt
+        self.landing_speed[touchdown] = np.hypot(new_state[2, touchdown], new_state[3, touchdown])
+        new_state[2:4, touchdown] = 0.0
+        self.landed |= touchdown
+        self.state = new_state
+        self.time = t + dt
+
+        q = self.dynamic_pressure()
+        higher = q > self.max_q
+        self.max_q = np.where(higher, q, self.max_q)
+        self.max_q_time = np.where(higher, self.time, self.max_q_time)
+
+    def run(self, end_time, dt=0.1, record_every=1.0):
+        # Integrates to end_time (or until every vehicle has landed) and
+        # returns (times, states) sampled every `record_every` seconds
+        times, states = [self.time], [self.state.copy()]
+        next_record = self.time + record_every
+        while self.time < end_time - 1e-9 and not np.all(self.landed):
+            self.step(min(dt, end_time - self.time))
+            if self.time >= next_record - 1e-9 or np.all(self.landed):
+                times.append(self.time)
+                states.append(self.state.copy())
+                next_record += record_every
+        return np.array(times), np.stack(states)
+
+
+def state_from_telemetry(telemetry, time, mass, count=1):
+    # Recorded state at `time`, repeated for `count` trajectories
+    times = telemetry['Time [s]']
+    i = min(int(np.searchsorted(times, time, side='left')), len(times) - 1)
+    row = telemetry[i]
+    state = [
+        row['Downrange distance [km]'] * 1000.0,
+        row['Smoothed altitude [km]'] * 1000.0,
+        row['Horizontal speed [m/s]'],
+        row['Vertical speed [m/s]'],
+        mass,
+    ]
+    return float(times[i]), np.tile(np.array(state, dtype=np.float64)[:, None], (1, count))
+
+
+def validate(telemetry, params=None, start_time=_EVENTS["Stage sep"], dt=0.1):
+    # Integrates from the recorded state at start_time and compares against
+    # the recorded Smoothed altitude / Downrange distance channels
+    params = params or VehicleParams()
+    mass = params.liftoff_mass if start_time <= 0 else params.separation_mass
+    t0, state = state_from_telemetry(telemetry, start_time, mass)
+    physics = BoosterPhysics(params, state, t0)
+    recorded_times = telemetry['Time [s]']
+    end_time = float(recorded_times[-1])
+    times, states = physics.run(end_time, dt, record_every=1.0)
+
+    mask = (recorded_times >= t0) & (recorded_times <= times[-1])
+    sample_times = recorded_times[mask]
+    altitude = np.interp(sample_times, times, states[:, 1, 0]) / 1000.0
+    downrange = np.interp(sample_times, times, states[:, 0, 0]) / 1000.0
+    altitude_error = altitude - telemetry['Smoothed altitude [km]'][mask]
+    downrange_error = downrange - telemetry['Downrange distance [km]'][mask]
+    return {
+        'start_time': t0,
+        'end_time': float(times[-1]),
+        'altitude_rmse_km': float(np.sqrt(np.mean(altitude_error ** 2))),
+        'downrange_rmse_km': float(np.sqrt(np.mean(downrange_error ** 2))),
+        'altitude_max_error_km': float(np.max(np.abs(altitude_error))),
+        'downrange_max_error_km': float(np.max(np.abs(downrange_error))),
+        'landing_downrange_km': float(states[-1, 0, 0] / 1000.0),
+        'max_q_kpa': float(physics.max_q[0] / 1000.0),
+        'max_q_time': float(physics.max_q_time[0]),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    from constants import DEFAULT_DATA_PATH
+    from data_loader import DataLoader
+
+    parser = argparse.ArgumentParser(description="Validate the booster physics model against recorded telemetry")
+    parser.add_argument('data', nargs='?', default=DEFAULT_DATA_PATH, help="flight telemetry CSV")
+    parser.add_argument('--start', type=float, default=_EVENTS["Stage sep"], help="flight time to start integrating from [s]")
+    parser.add_argument('--dt', type=float, default=0.1, help="integration step [s]")
+    args = parser.parse_args()
+    report = validate(DataLoader(args.data).load_data(), start_time=args.start, dt=args.dt)
+    for key, value in report.items():
+        print(f"{key}: {value:.2f}")
@@ -0,0 +1,97 @@
+import numpy as np
+from telemetry import TelemetrySample
+
+
+class TimeIndex:
+    def __init__(self, times):
+        self.times = np.asarray(times)
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def start(self):
+        return float(self.times[0])
+
+    @property
+    def end(self):
+        return float(self.times[-1])
+
+    def seek(self, time):
+        # Index of the last sample at or before `time`, clamped to the data
+        index = int(np.searchsorted(self.times, time, side='right')) - 1
+        return min(max(index, 0), len(self.times) - 1)
+
+    def first_at_or_after(self, time):
+        return min(int(np.searchsorted(self.times, time, side='left')), len(self.times) - 1)
+
+    def locate(self, time):
+        # Returns (index, fraction) such that `time` lies `fraction` of the way
+        # from sample `index` to sample `index + 1`
+        index = self.seek(time)
+        if index >= len(self.times) - 1:
+            return index, 0.0
+        t0, t1 = self.times[index], self.times[index + 1]
+        if t1 <= t0:
+            return index, 0.0
+        return index, float(min(max((time - t0) / (t1 - t0), 0.0), 1.0))
+
+    def interpolate(self, telemetry, time):
+        index, fraction = self.locate(time)
+        columns = telemetry.columns
+        if fraction == 0.0:
+            values = columns[:, index].copy()
+        else:
+            values = columns[:, index] + (columns[:, index + 1] - columns[:, index]) * fraction
+        return TelemetrySample(telemetry.schema, values)
+
+    def interpolate_values(self, values, time):
+        # One channel (any array aligned with the times) at `time`
+        index, fraction = self.locate(time)
+        if fraction == 0.0:
+            return float(values[index])
+        return float(values[index] + (values[index + 1] - values[index]) * fraction)
+
+
+class PlaybackClock:
+    def __init__(self, start, end, step=1 / 60, speed=1.0, max_steps=8):
+        self.start = start
+        self.end = end
+        self.step = step  # fixed simulation step, in seconds of wall time
+        self.speed = speed  # flight seconds per wall second; negative plays backwards
+        self.max_steps = max_steps  # cap per advance so a stall can't snowball
+        self.time = start
+        self.paused = False
+        self.accumulator = 0.0
+
+    def advance(self, real_dt):
+        if self.paused:
+            return 0
+        self.accumulator += real_dt
+        steps = 0
+        while self.accumulator >= self.step and steps < self.max_steps:
+            self.time = min(max(self.time + self.step * self.speed, self.start), self.end)
+            self.accumulator -= self.step
+            steps += 1
+        if steps == self.max_steps:
+            self.accumulator = 0.0
+        return steps
+
+    def seek(self, time):
+        self.time = min(max(time, self.start), self.end)
+        self.accumulator = 0.0
+
+    def scrub(self, delta):
+        self.seek(self.time + delta)
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+
+    def set_speed(self, speed):
+        self.speed = speed
+
+    def reverse(self):
+        self.speed = -self.speed
+
+    def at_end(self):
+        return self.time >= self.end if self.speed > 0 else self.time <= self.start
@@ -0,0 +1,184 @@
+import json
+import time
+from contextlib import nullcontext
+import numpy as np
+import pygame
+from constants import BLACK, WHITE
+
+DEFAULT_FRAMES = 600  # ten seconds at 60 FPS
+MAX_STAGES = 32
+EVENTS_PER_FRAME = 32
+PERCENTILES = (50, 95, 99)
+
+# Shared by every disabled profiler: entering it does nothing
+_NULL_STAGE = nullcontext()
+
+
+class _Stage:
+    __slots__ = ('profiler', 'index', 'start')
+
+    def __init__(self, profiler, index):
+        self.profiler = profiler
+        self.index = index
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler._record(self.index, self.start, time.perf_counter())
+        return False
+
+
+class FrameProfiler:
+    # Times named stages of each frame into fixed-size ring buffers: one row
+    # of per-stage totals per frame, plus every individual stage call for
+    # trace export. While disabled, stage() hands back a shared no-op
+    # context manager, so instrumented code costs one method call.
+    def __init__(self, frames=DEFAULT_FRAMES, enabled=False):
+        self.enabled = enabled
+        self.frames = frames
+        self.names = []
+        self._stages = {}
+        self.origin = time.perf_counter()
+
+        self.frame_start = np.zeros(frames)
+        self.frame_duration = np.zeros(frames)
+        self.stage_duration = np.zeros((frames, MAX_STAGES))
+        self.frame_count = 0
+        self._frame_open = False
+
+        events = frames * EVENTS_PER_FRAME
+        self.event_stage = np.zeros(events, dtype=np.int16)
+        self.event_start = np.zeros(events)
+        self.event_duration = np.zeros(events)
+        self.event_count = 0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self._frame_open = False
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_STAGE
+        stage = self._stages.get(name)
+        if stage is None:
+            if len(self.names) >= MAX_STAGES:
+                return _NULL_STAGE
+            stage = self._stages[name] = _Stage(self, len(self.names))
+            self.names.append(name)
+        return stage
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        row = self.frame_count % self.frames
+        self.stage_duration[row] = 0.0
+        self.frame_start[row] = time.perf_counter()
+        self._frame_open = True
+
+    def end_frame(self):
+        if not self._frame_open:
+            return
+        row = self.frame_count % self.frames
+        self.frame_duration[row] = time.perf_counter() - self.frame_start[row]
+        self.frame_count += 1
+        self._frame_open = False
+
+    def _record(self, index, start, end):
+        if self._frame_open:
+            self.stage_duration[self.frame_count % self.frames, index] += end - start
+        slot = self.event_count % len(self.event_start)
+        self.event_stage[slot] = index
+        self.event_start[slot] = start
+        self.event_duration[slot] = end - start
+        self.event_count += 1
+
+    def _filled(self):
+        return min(self.frame_count, self.frames)
+
+    def frame_percentiles(self, percentiles=PERCENTILES):
+        # Frame times [s] over the buffered frames
+        filled = self._filled()
+        if filled == 0:
+            return None
+        return np.percentile(self.frame_duration[:filled], percentiles)
+
+    def stage_breakdown(self):
+        # (name, mean seconds per frame) over the buffered frames, slowest first
+        filled = self._filled()
+        if filled == 0:
+            return []
+        means = self.stage_duration[:filled, :len(self.names)].mean(axis=0)
+        order = np.argsort(means)[::-1]
+        return [(self.names[i], float(means[i])) for i in order]
+
+    def trace_events(self):
+        # Chrome trace-event "complete" events, oldest first
+        events = []
+        total = min(self.event_count, len(self.event_start))
+        first = self.event_count - total
+        slots = (first + np.arange(total)) % len(self.event_start)
+        for slot in slots:
+            events.append({
+                'name': self.names[self.event_stage[slot]], 'cat': 'stage', 'ph': 'X', 'pid': 0, 'tid': 0,
+                'ts': (self.event_start[slot] - self.origin) * 1e6, 'dur': self.event_duration[slot] * 1e6,
+            })
+        filled = self._filled()
+        first = self.frame_count - filled
+        for row in (first + np.arange(filled)) % self.frames:
+            events.append({
+                'name': 'frame', 'cat': 'frame', 'ph': 'X', 'pid': 0, 'tid': 0,
+                'ts': (self.frame_start[row] - self.origin) * 1e6, 'dur': self.frame_duration[row] * 1e6,
+            })
+        events.sort(key=lambda event: event['ts'])
+        return events
+
+    def export_chrome_trace(self, path):
+        # Loadable in chrome://tracing or ui.perfetto.dev
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}, file)
+
+
+class ProfilerHUD:
+    # Semi-transparent panel with frame-time percentiles and the per-stage
+    # breakdown. The text is re-rendered a few times per second, not per frame.
+    def __init__(self, profiler, font, refresh_interval=0.25, visible=False):
+        self.profiler = profiler
+        self.font = font
+        self.refresh_interval = refresh_interval
+        self.visible = visible
+        self.panel = None
+        self.last_refresh = -float('inf')
+
+    def toggle(self):
+        self.visible = not self.visible
+        if self.visible and not self.profiler.enabled:
+            self.profiler.toggle()
+
+    def lines(self):
+        percentiles = self.profiler.frame_percentiles()
+        if percentiles is None:
+            return ["Profiler: collecting..."]
+        lines = ["Frame " + " / ".join(f"p{p} {v * 1000:.2f}" for p, v in zip(PERCENTILES, percentiles)) + " ms"]
+        for name, mean in self.profiler.stage_breakdown():
+            lines.append(f"{name}: {mean * 1000:.3f} ms")
+        return lines
+
+    def refresh(self):
+        surfaces = [self.font.render(line, True, WHITE) for line in self.lines()]
+        width = max(surface.get_width() for surface in surfaces) + 12
+        height = sum(surface.get_height() + 2 for surface in surfaces) + 10
+        self.panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.panel.fill((*BLACK, 170))
+        y = 5
+        for surface in surfaces:
+            self.panel.blit(surface, (6, y))
+            y += surface.get_height() + 2
+
+    def draw(self, surface):
+        now = time.perf_counter()
+        if self.panel is None or now - self.last_refresh >= self.refresh_interval:
+            self.refresh()
+            self.last_refresh = now
+        return surface.blit(self.panel, (surface.get_width() - self.panel.get_width() - 10, 10))
@@ -0,0 +1,269 @@
+import argparse
+import sys
+import warnings
+import numpy as np
+
+DEFAULT_BLOCK_SIZE = 64
+
+
+class _SparseTable:
+    # Range-argmax over block maxima in O(1) per query, O(n log n) to build
+    def __init__(self, values):
+        self.values = values
+        self.levels = [np.arange(len(values))]
+        width = 1
+        while 2 * width <= len(values):
+            previous = self.levels[-1]
+            left, right = previous[:-width], previous[width:]
+            self.levels.append(np.where(values[left] >= values[right], left, right))
+            width *= 2
+
+    def argmax(self, lo, hi):
+        level = (hi - lo).bit_length() - 1
+        table = self.levels[level]
+        left, right = table[lo], table[hi - (1 << level)]
+        return int(left if self.values[left] >= self.values[right] else right)
+
+
+def _fill_nan(values, fill):
+    return np.where(np.isnan(values), fill, values)
+
+
+class _ChannelStats:
+    # Aggregates for every complete block of `block_size` samples, indexed by
+    # absolute sample position so a sliding stream window can add blocks at
+    # the end and drop evicted ones at the front without a rebuild. NaNs are
+    # skipped: a block with none but NaNs has max -inf, min +inf, count 0.
+    def __init__(self, block_size):
+        self.block_size = block_size
+        self.first_block = 0
+        self.block_max = np.empty(0)
+        self.block_min = np.empty(0)
+        self.block_argmax = np.empty(0, dtype=np.int64)
+        self.block_argmin = np.empty(0, dtype=np.int64)
+        self.block_sum = np.empty(0)
+        self.block_count = np.empty(0, dtype=np.int64)
+        self._tables = None
+
+    @property
+    def end_block(self):
+        return self.first_block + len(self.block_max)
+
+    def extend(self, values, first_block):
+        # `values` covers complete blocks starting at block `first_block`
+        size = self.block_size
+        blocks = values.reshape(-1, size)
+        offsets = first_block * size + np.arange(len(blocks)) * size
+        if len(self.block_max) == 0:
+            self.first_block = first_block
+        for_max, for_min = _fill_nan(blocks, -np.inf), _fill_nan(blocks, np.inf)
+        self.block_max = np.concatenate((self.block_max, for_max.max(axis=1)))
+        self.block_min = np.concatenate((self.block_min, for_min.min(axis=1)))
+        self.block_argmax = np.concatenate((self.block_argmax, offsets + for_max.argmax(axis=1)))
+        self.block_argmin = np.concatenate((self.block_argmin, offsets + for_min.argmin(axis=1)))
+        self.block_sum = np.concatenate((self.block_sum, _fill_nan(blocks, 0.0).sum(axis=1)))
+        self.block_count = np.concatenate((self.block_count, np.count_nonzero(~np.isnan(blocks), axis=1)))
+        self._tables = None
+
+    def trim(self, first_block):
+        drop = min(max(first_block - self.first_block, 0), len(self.block_max))
+        if drop:
+            self.block_max = self.block_max[drop:]
+            self.block_min = self.block_min[drop:]
+            self.block_argmax = self.block_argmax[drop:]
+            self.block_argmin = self.block_argmin[drop:]
+            self.block_sum = self.block_sum[drop:]
+            self.block_count = self.block_count[drop:]
+            self._tables = None
+        self.first_block = max(self.first_block, first_block)
+
+    def tables(self):
+        if self._tables is None:
+            self._tables = (
+                _SparseTable(self.block_max),
+                _SparseTable(-self.block_min),
+                np.concatenate(([0.0], np.cumsum(self.block_sum))),
+                np.concatenate(([0], np.cumsum(self.block_count))),
+            )
+        return self._tables
+
+
+class TelemetryStats:
+    # Answers min/max/mean/argmax/argmin for any channel over any time window.
+    # Whole blocks come from precomputed tables; at most two partial blocks
+    # at the edges of the window are scanned, so every query touches
+    # O(block_size) samples no matter how long the log is. NaN samples are
+    # ignored, as by np.nanmax and friends; a window without any other
+    # samples has NaN for its min, max and mean and no argmax/argmin.
+    def __init__(self, telemetry=None, block_size=DEFAULT_BLOCK_SIZE, time_channel='Time [s]'):
+        self.block_size = block_size
+        self.time_channel = time_channel
+        self.telemetry = None
+        self.derived = None
+        self.window_start = 0
+        self._channels = {}
+        if telemetry is not None:
+            self.update(telemetry)
+
+    def update(self, telemetry, window_start=0, derived=None):
+        # For streams, `telemetry` is the current window and `window_start`
+        # the absolute index of its first sample; only new blocks are reduced.
+        # `derived`, a DerivedChannels view of `telemetry`, makes its derived
+        # channels queryable too. Those are re-indexed from scratch after an
+        # update, since a derived sample can depend on the ones after it.
+        self.telemetry = telemetry
+        self.window_start = window_start
+        self.derived = derived
+        for name in list(self._channels):
+            if name not in telemetry.schema:
+                del self._channels[name]
+        for name, stats in self._channels.items():
+            self._sync(name, stats)
+
+    def _values(self, name):
+        if name in self.telemetry.schema or self.derived is None:
+            return self.telemetry.column(name)
+        return self.derived[name]
+
+    def _complete_blocks(self):
+        size = self.block_size
+        first = -(-self.window_start // size)
+        end = (self.window_start + len(self.telemetry)) // size
+        return first, max(first, end)
+
+    def _sync(self, name, stats):
+        first, end = self._complete_blocks()
+        stats.trim(first)
+        start = max(first, stats.end_block)
+        if len(stats.block_max) == 0:
+            start = first
+        if end > start:
+            values = self._values(name)
+            lo = start * self.block_size - self.window_start
+            hi = end * self.block_size - self.window_start
+            stats.extend(np.asarray(values[lo:hi], dtype=np.float64), start)
+
+    def _channel(self, name):
+        stats = self._channels.get(name)
+        if stats is None:
+            stats = self._channels[name] = _ChannelStats(self.block_size)
+            self._sync(name, stats)
+        return stats
+
+    def _index_range(self, start_time, end_time):
+        # Absolute [lo, hi) covering samples with start_time <= t <= end_time
+        times = self.telemetry.column(self.time_channel)
+        lo = 0 if start_time is None else int(np.searchsorted(times, start_time, side='left'))
+        hi = len(times) if end_time is None else int(np.searchsorted(times, end_time, side='right'))
+        if hi <= lo:
+            raise ValueError("empty time window")
+        return self.window_start + lo, self.window_start + hi
+
+    def _query(self, name, start_time, end_time, kind):
+        stats = self._channel(name)
+        lo, hi = self._index_range(start_time, end_time)
+        values = self._values(name)
+        size = self.block_size
+        b0 = max(-(-lo // size), stats.first_block)
+        b1 = min(hi // size, stats.end_block)
+
+        # (value, absolute index) candidates from the scanned edges and the tables
+        spans = [(lo, hi)] if b1 <= b0 else [(lo, b0 * size), (b1 * size, hi)]
+        if kind == 'mean':
+            total = count = 0
+            for a, b in spans:
+                segment = values[a - self.window_start:b - self.window_start]
+                total += float(np.nansum(segment))
+                count += int(np.count_nonzero(~np.isnan(segment)))
+            if b1 > b0:
+                _, _, sums, counts = stats.tables()
+                total += sums[b1 - stats.first_block] - sums[b0 - stats.first_block]
+                count += int(counts[b1 - stats.first_block] - counts[b0 - stats.first_block])
+            return total / count if count else float('nan')
+
+        pick = np.argmax if kind == 'max' else np.argmin
+        fill = -np.inf if kind == 'max' else np.inf
+        better = (lambda a, b: a > b) if kind == 'max' else (lambda a, b: a < b)
+        best_value, best_index = None, None
+        if b1 > b0:
+            table = stats.tables()[0 if kind == 'max' else 1]
+            block = table.argmax(b0 - stats.first_block, b1 - stats.first_block)
+            if stats.block_count[block]:  # otherwise every block in range is all NaN
+                best_index = int((stats.block_argmax if kind == 'max' else stats.block_argmin)[block])
+                best_value = float(values[best_index - self.window_start])
+        for a, b in spans:
+            segment = values[a - self.window_start:b - self.window_start]
+            valid = ~np.isnan(segment)
+            if not valid.any():
+                continue
+            i = int(pick(np.where(valid, segment, fill)))
+            # Ties go to the earliest sample
+            if best_value is None or better(segment[i], best_value) or (segment[i] == best_value and a + i < best_index):
+                best_value, best_index = float(segment[i]), a + i
+        if best_index is None:
+            return float('nan'), None
+        return best_value, best_index - self.window_start
+
+    def max(self, name, start_time=None, end_time=None):
+        return self._query(name, start_time, end_time, 'max')[0]
+
+    def min(self, name, start_time=None, end_time=None):
+        return self._query(name, start_time, end_time, 'min')[0]
+
+    def argmax(self, name, start_time=None, end_time=None):
+        # Row index into the current telemetry window
+        return self._position(name, start_time, end_time, 'max')
+
+    def argmin(self, name, start_time=None, end_time=None):
+        return self._position(name, start_time, end_time, 'min')
+
+    def _position(self, name, start_time, end_time, kind):
+        index = self._query(name, start_time, end_time, kind)[1]
+        if index is None:
+            raise ValueError(f"no samples of {name!r} in the time window")
+        return index
+
+    def mean(self, name, start_time=None, end_time=None):
+        return self._query(name, start_time, end_time, 'mean')
+
+
+def verify(telemetry, queries=200, seed=0, block_size=DEFAULT_BLOCK_SIZE):
+    # Compares every channel's index answers with plain NumPy over random
+    # windows; returns the (channel, start, end) windows that disagree
+    stats = TelemetryStats(telemetry, block_size)
+    times = telemetry['Time [s]']
+    rng = np.random.default_rng(seed)
+    windows = [(None, None)] + [tuple(sorted(rng.uniform(times[0], times[-1], 2))) for _ in range(queries)]
+    failures = []
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN windows
+        for start, end in windows:
+            lo = 0 if start is None else int(np.searchsorted(times, start, side='left'))
+            hi = len(times) if end is None else int(np.searchsorted(times, end, side='right'))
+            if hi <= lo:
+                continue
+            for name in telemetry.schema.names:
+                values = telemetry[name][lo:hi]
+                expected = [np.nanmax(values), np.nanmin(values), np.nanmean(values)]
+                got = [stats.max(name, start, end), stats.min(name, start, end), stats.mean(name, start, end)]
+                if not np.all(np.isnan(values)):
+                    expected += [lo + np.nanargmax(values), lo + np.nanargmin(values)]
+                    got += [stats.argmax(name, start, end), stats.argmin(name, start, end)]
+                if not np.allclose(got, expected, rtol=1e-9, equal_nan=True):
+                    failures.append((name, start, end))
+    return failures
+
+
+if __name__ == "__main__":
+    from constants import DEFAULT_DATA_PATH
+    from data_loader import DataLoader
+    parser = argparse.ArgumentParser(description="Check range-statistics answers against NumPy on a flight log")
+    parser.add_argument('data', nargs='?', default=DEFAULT_DATA_PATH, help="flight telemetry CSV")
+    parser.add_argument('--queries', type=int, default=200, help="random time windows to check")
+    parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE)
+    args = parser.parse_args()
+    failures = verify(DataLoader(args.data).load_data(), args.queries, block_size=args.block_size)
+    for name, start, end in failures[:20]:
+        print(f"mismatch: {name} over [{start}, {end}]")
+    print(f"{len(failures)} mismatches")
+    sys.exit(1 if failures else 0)
@@ -1,127 +1,304 @@
-import math
-import random
+import numpy as np
 import pygame
 import pygame.gfxdraw
 from rocket_renderer import RocketRenderer
-from constants import WHITE, BLACK, RED, BLUE, ORANGE
-from utils import map_value, calculate_top_position, is_rocket_inverted
+from vector_rocket_renderer import VectorRocketRenderer
+from particles import ParticleSystem
+from constants import WHITE, BLACK, RED, BLUE, ROCKET_IMAGE_PATH, ROCKET_SVG_PATH
+from lod import TrajectoryPyramid
+from viewport import Viewport
+from events import FlightEvents, STAGE_SEP
+from channels import FLIGHT_PATH_ANGLE
+from profiler import FrameProfiler
+from text_cache import TextCache, GlyphAtlas, GlyphReadout
+from utils import calculate_top_position, is_rocket_inverted
+
+def draw_pyramid(surface, viewport, pyramid, color, budget):
+    # The visible part of a TrajectoryPyramid, within `budget` vertices
+    for run in pyramid.visible_runs(*viewport.bounds(), budget):
+        if len(run) < 2:
+            continue
+        xs, ys = viewport.project(pyramid.x[run], pyramid.y[run])
+        points = np.column_stack((xs, ys)).astype(int).tolist()
+        pygame.draw.lines(surface, color, False, points, 1)
+
+# (label, channel, unit) of each line of the info panel
+INFO_FIELDS = [
+    ("Time:", 'Time [s]', "s"),
+    ("Altitude:", 'Smoothed altitude [km]', "km"),
+    ("Speed:", 'Smoothed speed [m/s]', "m/s"),
+    ("Mach:", 'Mach number', ""),
+    ("Dynamic Pressure:", 'Dynamic pressure [kPa]', "kPa"),
+]
+INFO_VALUE_WIDTH = 9  # characters per readout
 
 class Renderer:
-    def __init__(self, screen, width, height):
+    def __init__(self, screen, width, height, frame_dt=1 / 60, max_particles=2048, seed=None, max_vertices=2048,
+                 profiler=None, vector_rocket=False, dashboard=None):
         self.screen = screen
         self.width = width
         self.height = height
-        self.rocket_renderer = RocketRenderer('/home/luisgoc/workspace/super-heavy-simulation/assets/imgs/super_heavy_dark.png', initial_scale=0.5)
+        # Optional strip charts beside the trajectory; the plot keeps the rest
+        self.dashboard = dashboard
+        self.view_width = dashboard.layout(width, height) if dashboard is not None else width
+        if vector_rocket:
+            self.rocket_renderer = VectorRocketRenderer(ROCKET_SVG_PATH, initial_scale=0.5)
+        else:
+            self.rocket_renderer = RocketRenderer(ROCKET_IMAGE_PATH, initial_scale=0.5)
         self.trajectory_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        # Static layer (trajectory, events, labels), rebuilt only when its key changes
+        self.background = pygame.Surface((width, height))
+        self.background_key = None
+        self.background_revision = None
+        self.previous_rects = []
+        self.viewport = Viewport(self.plot_rect(self.view_width, height))
+        # Vertex budget for the trajectory, whatever the number of samples
+        self.max_vertices = max_vertices
+        self.pyramid = None
+        self.pyramid_revision = None
         self.font = pygame.font.Font(None, 24)
         self.small_font = pygame.font.Font(None, 14)
-        self.stage_separation_time = 60*2 + 48  # Tempo da separação dos estágios
+        # Static text is rendered once; readouts redraw only changed digits
+        self.text = TextCache(self.small_font, BLACK)
+        self.title_text = TextCache(self.font, BLACK)
+        self.atlas = GlyphAtlas(self.small_font, BLACK)
+        self.info_readouts = self.layout_info()
+        # Events of the flight being drawn, refreshed from the simulation every frame
+        self.events = FlightEvents()
         self.separation_started = False
+        self.frame_dt = frame_dt
+        self.particles = ParticleSystem(max_particles, seed=seed)
+        self.particle_backlog = 0.0
+        # Extra layers drawn under the trajectory, e.g. a DispersionOverlay
+        self.overlays = []
+        # Stage timings (a disabled profiler costs next to nothing) and the
+        # optional ProfilerHUD drawn on top of each frame
+        self.profiler = profiler or FrameProfiler()
+        self.hud = None
+
+    @staticmethod
+    def plot_rect(width, height):
+        return pygame.Rect(int(width * 0.1), int(height * 0.1), int(width * 0.8), int(height * 0.8))
+
+    @property
+    def stage_separation_time(self):
+        return self.events.time(STAGE_SEP)
 
     def set_rocket_scale(self, scale):
         self.rocket_renderer.set_scale(scale)
 
+    def resize(self, width, height):
+        self.screen = pygame.display.get_surface() or self.screen
+        self.width = width
+        self.height = height
+        self.trajectory_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.background = pygame.Surface((width, height))
+        self.view_width = self.dashboard.layout(width, height) if self.dashboard is not None else width
+        self.viewport.plot_rect = self.plot_rect(self.view_width, height)
+        self.invalidate_background()
+
+    def reseed(self, seed):
+        # Makes the particles emitted next frame depend only on `seed`, so
+        # frames can be rendered out of order (e.g. split across processes)
+        self.particles.reseed(seed)
+        self.particle_backlog = self.particles.rng.random()
+
+    def layout_info(self):
+        value_x = 10 + max(self.text.render(label).get_width() for label, _, _ in INFO_FIELDS) + 4
+        return [GlyphReadout(self.atlas, (value_x, 10 + i * 20), INFO_VALUE_WIDTH) for i in range(len(INFO_FIELDS))]
+
+    def invalidate_background(self):
+        self.background_key = None
+
+    def add_overlay(self, overlay):
+        # `overlay.draw(surface, viewport)` is called whenever the background is rebuilt
+        self.overlays.append(overlay)
+        self.invalidate_background()
+
     def render(self, simulation):
-        self.screen.fill(WHITE)
+        # Returns the screen areas that changed, for pygame.display.update
+        self.viewport.set_extent(simulation.get_max_downrange(), simulation.get_max_altitude())
+        self.events = simulation.events
+        key = (self.width, self.height, self.viewport.state, tuple(self.events))
+        profiler = self.profiler
+        tail = []
+        if key == self.background_key and simulation.revision != self.background_revision:
+            with profiler.stage('extend_background'):
+                tail = self.extend_background(simulation)
+            if tail is None:
+                self.invalidate_background()
+        if key != self.background_key:
+            with profiler.stage('build_background'):
+                self.build_background(simulation)
+                self.background_key = key
+                self.background_revision = simulation.revision
+                self.screen.blit(self.background, (0, 0))
+            full_redraw = True
+        else:
+            with profiler.stage('restore'):
+                for rect in self.previous_rects + tail:
+                    self.screen.blit(self.background, rect, rect)
+            full_redraw = False
+
+        # Readouts stay on screen between frames unless something erased them
+        for readout in self.info_readouts:
+            if full_redraw or readout.rect.collidelist(self.previous_rects) != -1:
+                readout.invalidate()
+
+        with profiler.stage('draw_current_position'):
+            rects = self.draw_current_position(simulation)
+        with profiler.stage('draw_info'):
+            info_rects = self.draw_info(simulation.get_current_data())
+        if self.dashboard is not None:
+            # Drawn after the rocket, so particles never cover the charts
+            with profiler.stage('dashboard'):
+                info_rects += self.dashboard.draw(self.screen, simulation, self.text, self.frame_dt,
+                                                  self.previous_rects, full_redraw)
+        if self.hud is not None and self.hud.visible:
+            with profiler.stage('hud'):
+                rects.append(self.hud.draw(self.screen))
+
+        dirty = [self.screen.get_rect()] if full_redraw else self.previous_rects + tail + rects + info_rects
+        self.previous_rects = rects
+        return dirty
+
+    def build_background(self, simulation):
+        self.background.fill(WHITE)
         self.draw_full_trajectory(simulation)
-        self.screen.blit(self.trajectory_surface, (0, 0))
-        self.draw_current_position(simulation)
-        self.draw_info(simulation.get_current_data())
-        self.draw_axis_labels()
+        self.background.blit(self.trajectory_surface, (0, 0))
+        self.draw_axis_labels(self.background)
+        self.draw_info_labels(self.background)
+
+    def extend_background(self, simulation):
+        # A live stream only appends samples, so the new end of the
+        # trajectory is drawn onto the cached layer instead of rebuilding it.
+        # Samples evicted from the stream window stay drawn until the next
+        # full rebuild. Returns the areas drawn, or None if a rebuild is due.
+        first = self.update_pyramid(simulation)
+        if first is None:
+            return None
+        self.background_revision = simulation.revision
+        data, start = simulation.data, simulation.window_start
+        # Starts from the last sample already drawn, to join the line up
+        first = max(first - 1 - start, 0)
+        xs, ys = self.viewport.project(data['Downrange distance [km]'][first:], data['Smoothed altitude [km]'][first:])
+        finite = np.isfinite(xs) & np.isfinite(ys)
+        if np.count_nonzero(finite) < 2:
+            return []
+        points = np.column_stack((xs[finite], ys[finite])).astype(int).tolist()
+        self.background.set_clip(self.viewport.plot_rect if self.viewport.is_zoomed else None)
+        rect = pygame.draw.lines(self.background, BLUE, False, points, 1)
+        self.background.set_clip(None)
+        return [rect]
+
+    def update_pyramid(self, simulation):
+        # Returns the absolute index of the first sample the pyramid gained,
+        # or None when it had to be built from scratch
+        if self.pyramid is not None and self.pyramid_revision == simulation.revision:
+            return self.pyramid.end
+        self.pyramid_revision = simulation.revision
+        data = simulation.data
+        x, y = data['Downrange distance [km]'], data['Smoothed altitude [km]']
+        # Streams report where their window starts; recorded flights are rebuilt
+        start = getattr(simulation, 'window_start', None)
+        pyramid = self.pyramid
+        if start is not None and pyramid is not None and pyramid.start <= start <= pyramid.end <= start + len(data):
+            first = pyramid.end
+            pyramid.extend(x[first - start:], y[first - start:])
+            pyramid.trim(start)
+            return first
+        self.pyramid = TrajectoryPyramid(x, y, start=start or 0)
+        return None
 
     def draw_full_trajectory(self, simulation):
         self.trajectory_surface.fill((0, 0, 0, 0))  # Clear with transparency
-        max_altitude = simulation.get_max_altitude()
-        max_downrange = simulation.get_max_downrange()
+        # Keep a zoomed-in trajectory out of the axis labels
+        self.trajectory_surface.set_clip(self.viewport.plot_rect if self.viewport.is_zoomed else None)
+        
+        for overlay in self.overlays:
+            overlay.draw(self.trajectory_surface, self.viewport)
         
-        trajectory_points = []
-        for point in simulation.data:
-            x = map_value(point['Downrange distance [km]'], 0, max_downrange, self.width * 0.1, self.width * 0.9)
-            y = map_value(point['Smoothed altitude [km]'], 0, max_altitude, self.height * 0.9, self.height * 0.1)
-            trajectory_points.append((int(x), int(y)))
+        self.update_pyramid(simulation)
         
-        if len(trajectory_points) > 1:
-            pygame.draw.lines(self.trajectory_surface, BLUE, False, trajectory_points, 1)
+        draw_pyramid(self.trajectory_surface, self.viewport, self.pyramid, BLUE, self.max_vertices)
         
-        self.draw_trajectory_events(simulation.data, max_altitude, max_downrange)
+        self.draw_trajectory_events(simulation.data, self.events)
+        self.trajectory_surface.set_clip(None)
 
     def draw_current_position(self, simulation):
         current_data = simulation.get_current_data()
         current_time = current_data['Time [s]']
-        max_altitude = simulation.get_max_altitude()
-        max_downrange = simulation.get_max_downrange()
+        pos_x, pos_y = self.viewport.project(current_data['Downrange distance [km]'], current_data['Smoothed altitude [km]'])
         
-        pos_x = map_value(current_data['Downrange distance [km]'], 0, max_downrange, self.width * 0.1, self.width * 0.9)
-        pos_y = map_value(current_data['Smoothed altitude [km]'], 0, max_altitude, self.height * 0.9, self.height * 0.1)
+        self.update_attitude(simulation)
         
-        angle = self.calculate_angle(current_data)
+        rocket_height = self.rocket_renderer.get_height()
+        top_x, top_y = calculate_top_position(pos_x, pos_y, self.rocket_renderer.current_angle, rocket_height / 2,
+                                              current_time, self.stage_separation_time)
+        
+        rects = [self.rocket_renderer.render(self.screen, pos_x, pos_y)]
+        rects += self.draw_fire_particles(pos_x, pos_y, self.rocket_renderer.current_angle, current_data['Smoothed speed [m/s]'], current_time)
+        rects.append(pygame.draw.circle(self.screen, RED, (int(top_x), int(top_y)), 3))
+        return rects
+
+    def update_attitude(self, simulation):
+        current_time = simulation.get_current_time()
+        separated = self.stage_separation_time is not None and current_time >= self.stage_separation_time
         
-        if current_time >= self.stage_separation_time and not self.separation_started:
+        if separated and not self.separation_started:
             self.separation_started = True
-            self.rocket_renderer.start_rotation(angle + 180)
+            # Screen angles turn the other way from the flight path angle
+            angle = -simulation.get_current_value(FLIGHT_PATH_ANGLE)
+            self.rocket_renderer.start_rotation((angle + 180) % 360)
+        elif not separated and self.separation_started:
+            # Scrubbed back to before separation
+            self.separation_started = False
+            self.rocket_renderer.reset_rotation()
         
         self.rocket_renderer.update_rotation()
-        
-        rocket_height = self.rocket_renderer.get_height()
-        top_x, top_y = calculate_top_position(pos_x, pos_y, self.rocket_renderer.current_angle, rocket_height / 2, current_time)
-        
-        self.rocket_renderer.render(self.screen, pos_x, pos_y)
-        self.draw_fire_particles(pos_x, pos_y, self.rocket_renderer.current_angle, current_data['Smoothed speed [m/s]'], current_time)
-        pygame.draw.circle(self.screen, RED, (int(top_x), int(top_y)), 3)
 
     def draw_info(self, current_data):
-        info_text = [
-            f"Time: {current_data['Time [s]']:.2f} s",
-            f"Altitude: {current_data['Smoothed altitude [km]']:.2f} km",
-            f"Speed: {current_data['Smoothed speed [m/s]']:.2f} m/s",
-            f"Mach: {current_data['Mach number']:.2f}",
-            f"Dynamic Pressure: {current_data['Dynamic pressure [kPa]']:.2f} kPa"
-        ]
-        for i, text in enumerate(info_text):
-            text_surface = self.small_font.render(text, True, BLACK)
-            self.screen.blit(text_surface, (10, 10 + i * 20))
-
-    def draw_axis_labels(self):
-        title = self.font.render("Trajectory profile", True, BLACK)
-        self.screen.blit(title, (self.width // 2 - title.get_width() // 2, 10))
-        
-        x_label = self.font.render("Downrange distance [km]", True, BLACK)
-        self.screen.blit(x_label, (self.width // 2 - x_label.get_width() // 2, self.height - 30))
+        # Only the values change; labels and units are part of the background
+        rects = []
+        for readout, (_, channel, _) in zip(self.info_readouts, INFO_FIELDS):
+            rects += readout.draw(self.screen, self.background, current_data[channel])
+        return rects
+
+    def draw_info_labels(self, surface):
+        for readout, (label, _, unit) in zip(self.info_readouts, INFO_FIELDS):
+            x, y = readout.position
+            surface.blit(self.text.render(label), (10, y))
+            if unit:
+                surface.blit(self.text.render(unit), (readout.rect.right + 4, y))
+
+    def draw_axis_labels(self, surface):
+        title = self.title_text.render("Trajectory profile")
+        surface.blit(title, (self.view_width // 2 - title.get_width() // 2, 10))
         
-        y_label = self.font.render("Altitude [km]", True, BLACK)
-        y_label = pygame.transform.rotate(y_label, 90)
-        self.screen.blit(y_label, (10, self.height // 2 - y_label.get_height() // 2))
-
-    def draw_trajectory_events(self, data, max_altitude, max_downrange):
-        events = [
-            ("Max Q", 60),
-            ("MECO", 60*2 + 42),
-            ("Stage sep", 60*2 + 48),
-            ("Boostback start", 60*2 + 54),
-            ("Boostback end", 60*3 + 48),
-            ("Gridfins live", 60*6 + 5),
-            ("Landing burn", 60*6 + 54),
-        ]
+        x_label = self.title_text.render("Downrange distance [km]")
+        surface.blit(x_label, (self.view_width // 2 - x_label.get_width() // 2, self.height - 30))
         
+        y_label = self.title_text.render("Altitude [km]", angle=90)
+        surface.blit(y_label, (10, self.height // 2 - y_label.get_height() // 2))
+
+    def draw_trajectory_events(self, data, events):
+        times = data['Time [s]']
         for label, time in events:
-            point = next(p for p in data if p['Time [s]'] >= time)
-            x = map_value(point['Downrange distance [km]'], 0, max_downrange, self.width * 0.1, self.width * 0.9)
-            y = map_value(point['Smoothed altitude [km]'], 0, max_altitude, self.height * 0.9, self.height * 0.1)
+            point = data[int(np.searchsorted(times, time, side='left'))]
+            x, y = self.viewport.project(point['Downrange distance [km]'], point['Smoothed altitude [km]'])
             
             pygame.draw.circle(self.trajectory_surface, RED, (int(x), int(y)), 3)
-            text_surface = self.small_font.render(label, True, BLACK)
+            text_surface = self.text.render(label)
             self.trajectory_surface.blit(text_surface, (int(x) + 5, int(y) - 15))
 
     def draw_fire_particles(self, x, y, angle, speed, time):
-        num_particles = int(speed / 10)
-        for _ in range(num_particles):
-            angle_offset = random.uniform(-30, 30)
-            distance = random.uniform(20, 40)
-            particle_x = x - distance * math.sin(math.radians(angle + angle_offset))
-            particle_y = y + distance * math.cos(math.radians(angle + angle_offset))
-            color = random.choice([RED, ORANGE])
-            pygame.draw.circle(self.screen, color, (int(particle_x), int(particle_y)), random.randint(1, 3))
-
-    @staticmethod
-    def calculate_angle(data):
-        return -math.degrees(math.atan2(data['Vertical speed [m/s]'], data['Horizontal speed [m/s]']))
\ No newline at end of file
+        # Emit at the rate that keeps about speed/10 particles alive, the
+        # density the old one-frame bursts had
+        self.particle_backlog += speed / 10 * self.frame_dt / self.particles.mean_lifetime
+        emitted = int(self.particle_backlog)
+        self.particle_backlog -= emitted
+        with self.profiler.stage('particles'):
+            self.particles.emit(emitted, x, y, angle)
+            self.particles.update(self.frame_dt)
+            rect = self.particles.draw(self.screen)
+        return [rect] if rect else []
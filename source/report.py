@@ -0,0 +1,260 @@
+import argparse
+import glob
+import hashlib
+import html
+import inspect
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from channels import DerivedChannels
+from constants import DEFAULT_DATA_PATH
+from data_loader import DataLoader
+from events import detect_events
+from flights import load_flights
+from physics import standard_atmosphere
+from telemetry import Telemetry
+from telemetry_cache import file_digest
+
+# Bump whenever the plots change, so cached images are redrawn
+REPORT_VERSION = 1
+FIGURE_SIZE = (10, 4)  # inches
+EVENT_FIGURE_SIZE = (10, 8)
+DPI = 100
+EVENT_WINDOW = 30.0  # seconds either side of each event
+EVENT_CHANNELS = [
+    'Smoothed altitude [km]',
+    'Smoothed speed [m/s]',
+    'Total acceleration [m/s^2]',
+    'Dynamic pressure [kPa]',
+]
+MANIFEST_NAME = '.report-cache.json'
+# The code that computes what is plotted (parsing, the columnar store and
+# its cache, derived channels and the atmosphere model they use, event
+# detection): editing it redraws the plots
+SOURCE_FILES = sorted({inspect.getsourcefile(code) for code in
+                       (DataLoader, Telemetry, file_digest, DerivedChannels, standard_atmosphere, detect_events)})
+_source_digest = None
+
+
+def source_digest():
+    global _source_digest
+    if _source_digest is None:
+        _source_digest = hashlib.sha256(''.join(map(file_digest, SOURCE_FILES)).encode()).hexdigest()
+    return _source_digest
+
+
+def slugify(text):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+class PlotJob:
+    # One image: `subject` is a channel name ('channel' plots) or an event
+    # label ('event' plots)
+    def __init__(self, path, digest, kind, subject, output, window=EVENT_WINDOW):
+        self.path = path
+        self.digest = digest
+        self.kind = kind
+        self.subject = subject
+        self.output = output
+        self.window = window
+
+    def key(self):
+        # Everything the image depends on; a different key means redraw
+        spec = [REPORT_VERSION, matplotlib.__version__, source_digest(), self.digest, self.kind, self.subject, DPI]
+        if self.kind == 'channel':
+            spec.append(FIGURE_SIZE)
+        else:
+            spec += [EVENT_FIGURE_SIZE, self.window, EVENT_CHANNELS]
+        return hashlib.sha256(json.dumps(spec).encode()).hexdigest()
+
+
+# Per worker process: the flights its jobs have touched so far
+_flights = {}
+
+
+def _load(path):
+    flight = _flights.get(path)
+    if flight is None:
+        telemetry = DataLoader(path).load_data()
+        flight = _flights[path] = (DerivedChannels(telemetry), detect_events(telemetry))
+    return flight
+
+
+def _mark_events(axes, events, start=None, end=None):
+    for label, event_time in events:
+        if (start is None or event_time >= start) and (end is None or event_time <= end):
+            axes.axvline(event_time, color='tab:red', linewidth=0.8, alpha=0.6)
+            axes.annotate(label, (event_time, 1.0), xycoords=('data', 'axes fraction'), rotation=90,
+                          fontsize=7, va='top', ha='right', color='tab:red')
+
+
+def render_job(job):
+    # Draws straight onto an Agg canvas: no pyplot state, no GUI backend
+    channels, events = _load(job.path)
+    times = channels['Time [s]']
+    title = os.path.splitext(os.path.basename(job.path))[0]
+    if job.kind == 'channel':
+        figure = Figure(figsize=FIGURE_SIZE, dpi=DPI)
+        axes = figure.add_subplot()
+        axes.plot(times, channels[job.subject], linewidth=1.0)
+        _mark_events(axes, events)
+        axes.set_xlabel('Time [s]')
+        axes.set_ylabel(job.subject)
+        axes.set_title(f"{title}: {job.subject}")
+        axes.grid(True, alpha=0.3)
+    else:
+        center = events.time(job.subject)
+        start, end = center - job.window, center + job.window
+        lo, hi = times.searchsorted(start, side='left'), times.searchsorted(end, side='right')
+        figure = Figure(figsize=EVENT_FIGURE_SIZE, dpi=DPI)
+        names = [name for name in EVENT_CHANNELS if name in channels]
+        for i, name in enumerate(names):
+            axes = figure.add_subplot(len(names), 1, i + 1)
+            axes.plot(times[lo:hi], channels[name][lo:hi], linewidth=1.0)
+            _mark_events(axes, events, start, end)
+            axes.set_xlim(start, end)
+            axes.set_ylabel(name, fontsize=8)
+            axes.grid(True, alpha=0.3)
+        axes.set_xlabel('Time [s]')
+        figure.suptitle(f"{title}: {job.subject} at T+{center:.0f} s")
+    figure.tight_layout()
+    FigureCanvasAgg(figure).print_png(job.output)
+    return job.output
+
+
+def find_flights(paths):
+    # CSV files, with directories expanded to the CSVs they contain
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found += sorted(glob.glob(os.path.join(path, '*.csv')))
+        else:
+            found.append(path)
+    return found
+
+
+def flight_dir(out_dir, path):
+    # Named after the file, plus a digest of its directory so same-named
+    # logs from different places don't share a folder
+    parent = hashlib.sha256(os.path.dirname(os.path.abspath(path)).encode()).hexdigest()[:8]
+    return os.path.join(out_dir, f"{slugify(os.path.splitext(os.path.basename(path))[0])}-{parent}")
+
+
+def plan(paths, out_dir, window=EVENT_WINDOW, workers=None):
+    # Every plot of every flight, in flight order; also returns
+    # {flight path: [jobs]} for the index pages
+    by_flight = {}
+    for path, telemetry in zip(paths, load_flights(paths, workers)):
+        digest = file_digest(path)
+        directory = flight_dir(out_dir, path)
+        jobs = []
+        for name in DerivedChannels(telemetry).names():
+            if name != 'Time [s]':
+                jobs.append(PlotJob(path, digest, 'channel', name, os.path.join(directory, f"{slugify(name)}.png")))
+        for label, _ in detect_events(telemetry):
+            output = os.path.join(directory, f"event-{slugify(label)}.png")
+            jobs.append(PlotJob(path, digest, 'event', label, output, window))
+        by_flight[path] = jobs
+    return [job for jobs in by_flight.values() for job in jobs], by_flight
+
+
+def write_index(out_dir, by_flight):
+    lines = ['<!DOCTYPE html>', '<meta charset="utf-8">', '<title>Telemetry report</title>']
+    for path, jobs in by_flight.items():
+        lines.append(f"<h2>{html.escape(path)}</h2>")  # as given, since basenames may repeat
+        for job in jobs:
+            source = os.path.relpath(job.output, out_dir)
+            lines.append(f'<img src="{html.escape(source)}" alt="{html.escape(job.subject)}" width="600">')
+    index = os.path.join(out_dir, 'index.html')
+    with open(index, 'w') as file:
+        file.write('\n'.join(lines) + '\n')
+    return index
+
+
+def _save_manifest(path, manifest):
+    with open(path, 'w') as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+
+
+def generate(paths, out_dir, workers=None, window=EVENT_WINDOW, force=False):
+    # Returns (rendered, up to date) plot counts
+    paths = find_flights(paths)
+    os.makedirs(out_dir, exist_ok=True)
+    jobs, by_flight = plan(paths, out_dir, window, workers)
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        manifest = {}
+
+    # Plots the plan no longer produces (a flight left out of this run, an
+    # event no longer detected) go, along with their entries
+    planned = {os.path.relpath(job.output, out_dir) for job in jobs}
+    pruned = [output for output in manifest if output not in planned]
+    for output in pruned:
+        del manifest[output]
+        path = os.path.join(out_dir, output)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        try:
+            os.rmdir(os.path.dirname(path))  # only once the flight's folder is empty
+        except OSError:
+            pass
+    if pruned:
+        _save_manifest(manifest_path, manifest)
+
+    keys = [job.key() for job in jobs]
+    stale = [(job, key) for job, key in zip(jobs, keys)
+             if force or manifest.get(os.path.relpath(job.output, out_dir)) != key or not os.path.exists(job.output)]
+    for job, _ in stale:
+        os.makedirs(os.path.dirname(job.output), exist_ok=True)
+
+    if stale:
+        workers = workers or os.cpu_count() or 1
+        try:
+            if workers <= 1:
+                rendered = map(render_job, [job for job, _ in stale])
+                for (job, key), _ in zip(stale, rendered):
+                    manifest[os.path.relpath(job.output, out_dir)] = key
+            else:
+                # Jobs are in flight order, so each chunk mostly reuses one flight
+                chunk_size = max(1, len(stale) // (workers * 4))
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    rendered = pool.map(render_job, [job for job, _ in stale], chunksize=chunk_size)
+                    for (job, key), _ in zip(stale, rendered):
+                        manifest[os.path.relpath(job.output, out_dir)] = key
+        finally:
+            # Whatever finished stays cached, even if the run was interrupted
+            _save_manifest(manifest_path, manifest)
+    write_index(out_dir, by_flight)
+    return len(stale), len(jobs) - len(stale)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Plot every channel and detected event window of one or more flights")
+    parser.add_argument('data', nargs='*', default=[DEFAULT_DATA_PATH], help="flight telemetry CSVs or directories of them")
+    parser.add_argument('--out', required=True, help="output directory")
+    parser.add_argument('--workers', type=int, help="worker processes (default: all cores)")
+    parser.add_argument('--window', type=float, default=EVENT_WINDOW, help="seconds shown either side of each event")
+    parser.add_argument('--force', action='store_true', help="redraw every plot, ignoring the cache")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    started = time.perf_counter()
+    rendered, cached = generate(args.data, args.out, args.workers, args.window, args.force)
+    elapsed = time.perf_counter() - started
+    print(f"Rendered {rendered} plots ({cached} up to date) in {elapsed:.1f} s: {os.path.join(args.out, 'index.html')}")
+
+
+if __name__ == "__main__":
+    main()
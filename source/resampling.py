@@ -0,0 +1,229 @@
+import argparse
+import sys
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from data_loader import DataLoader
+from telemetry import Telemetry, TelemetrySchema
+
+DEFAULT_CHUNK_ROWS = 1 << 16
+METHODS = ('linear', 'cubic')
+# Smoothed channel -> the raw channel it is derived from
+RAW_CHANNELS = {
+    'Smoothed altitude [km]': 'Raw altitude [km]',
+    'Smoothed speed [m/s]': 'Raw speed [m/s]',
+}
+
+
+def uniform_grid(times, rate):
+    # Evenly spaced times at `rate` Hz covering the recording
+    count = int(np.floor((times[-1] - times[0]) * rate + 1e-9)) + 1
+    return times[0] + np.arange(count) / rate
+
+
+def _interpolate(times, columns, targets, method):
+    # All channels at `targets` in one gather. Cubic is a Hermite spline with
+    # the same second-order slopes np.gradient gives on the full recording.
+    last = len(times) - 1
+    if last == 0:
+        return np.repeat(columns, len(targets), axis=1)
+    index = np.clip(np.searchsorted(times, targets, side='right') - 1, 0, last - 1)
+    t0, t1 = times[index], times[index + 1]
+    span = t1 - t0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        u = np.clip(np.where(span > 0, (targets - t0) / span, 0.0), 0.0, 1.0)
+    y0, y1 = columns[:, index], columns[:, index + 1]
+    if method == 'linear':
+        return y0 + (y1 - y0) * u
+
+    # Slopes on just the samples this chunk touches, plus one neighbour each
+    # side so the ends of the slice still get central differences
+    lo = max(int(index[0]) - 1, 0)
+    hi = min(int(index[-1]) + 3, last + 1)
+    slopes = np.gradient(columns[:, lo:hi], times[lo:hi], axis=1)
+    m0, m1 = slopes[:, index - lo] * span, slopes[:, index + 1 - lo] * span
+    u2 = u * u
+    u3 = u2 * u
+    return ((2 * u3 - 3 * u2 + 1) * y0 + (u3 - 2 * u2 + u) * m0
+            + (-2 * u3 + 3 * u2) * y1 + (u3 - u2) * m1)
+
+
+def resample(telemetry, rate, method='linear', chunk_rows=DEFAULT_CHUNK_ROWS):
+    # Every channel on an even `rate` Hz grid
+    if method not in METHODS:
+        raise ValueError(f"unknown interpolation method {method!r}; expected one of {METHODS}")
+    times = telemetry['Time [s]']
+    grid = uniform_grid(times, rate)
+    columns = np.empty((len(telemetry.schema), len(grid)), dtype=telemetry.schema.dtype)
+    for first in range(0, len(grid), chunk_rows):
+        targets = grid[first:first + chunk_rows]
+        columns[:, first:first + len(targets)] = _interpolate(times, telemetry.columns, targets, method)
+    columns[telemetry.schema.index('Time [s]')] = grid
+    return Telemetry(telemetry.schema, columns)
+
+
+class SavitzkyGolay:
+    # Least-squares polynomial of `order` over a centered window of `window`
+    # samples. Assumes evenly spaced samples; resample irregular logs first.
+    # The first and last half-windows use the fit of the nearest full window.
+    def __init__(self, window=15, order=3):
+        if window % 2 == 0:
+            raise ValueError("Savitzky-Golay window must be odd")
+        self.window = window
+        self.order = order
+
+    @staticmethod
+    def projection(window, order):
+        # Row j maps a window of samples to the fitted value at position j
+        x = np.arange(window) - window // 2
+        vander = np.vander(x, order + 1, increasing=True)
+        return vander @ np.linalg.pinv(vander)
+
+    def apply(self, times, values, chunk_rows=DEFAULT_CHUNK_ROWS):
+        count = len(values)
+        window = min(self.window, count if count % 2 else count - 1)
+        order = min(self.order, window - 1)
+        if window < 3 or order < 1:
+            return np.array(values, dtype=np.float64)
+        half = window // 2
+        projection = self.projection(window, order)
+        smoothed = np.empty(count)
+        smoothed[:half] = projection[:half] @ values[:window]
+        smoothed[count - half:] = projection[half + 1:] @ values[count - window:]
+        for first in range(half, count - half, chunk_rows):
+            last = min(first + chunk_rows, count - half)
+            smoothed[first:last] = sliding_window_view(values[first - half:last + half], window) @ projection[half]
+        return smoothed
+
+
+class KalmanFilter:
+    # Constant-velocity Kalman filter over the sample times; missing (NaN)
+    # samples are bridged by the prediction. Noise levels left as None are
+    # estimated from the whole series: the measurement noise from the
+    # quantization step, the process noise from the spread of second
+    # differences. Only the recursion is causal, so a prefix of the log (e.g.
+    # a live capture) smooths the same as the full log only when both noise
+    # levels are given.
+    def __init__(self, process_noise=None, measurement_noise=None):
+        self.process_noise = process_noise  # acceleration std, channel units / s^2
+        self.measurement_noise = measurement_noise  # channel units
+
+    @staticmethod
+    def estimate_noise(times, values):
+        finite = np.isfinite(values)
+        steps = np.abs(np.diff(values[finite]))
+        steps = steps[steps > 0]
+        measurement = float(np.min(steps)) / np.sqrt(12) if len(steps) else 1.0
+        dt = float(np.median(np.diff(times))) if len(times) > 1 else 1.0
+        second = np.diff(values[finite], 2)
+        variance = float(np.var(second)) - 6 * measurement ** 2 if len(second) else 0.0
+        process = np.sqrt(max(variance, measurement ** 2)) / dt ** 2
+        return process, measurement
+
+    def apply(self, times, values, chunk_rows=DEFAULT_CHUNK_ROWS):
+        count = len(values)
+        smoothed = np.empty(count)
+        if count == 0:
+            return smoothed
+        process, measurement = self.process_noise, self.measurement_noise
+        if process is None or measurement is None:
+            estimated = self.estimate_noise(times, values)
+            process = estimated[0] if process is None else process
+            measurement = estimated[1] if measurement is None else measurement
+        q, r = process ** 2, measurement ** 2
+
+        # State (x, v) with covariance [[p00, p01], [p01, p11]], kept as
+        # floats: the recursion is sequential, so scalars beat tiny arrays
+        start = np.flatnonzero(np.isfinite(values))
+        x = float(values[start[0]]) if len(start) else 0.0
+        v, p00, p01, p11 = 0.0, r, 0.0, r
+        previous = float(times[0])
+        for first in range(0, count, chunk_rows):
+            last = min(first + chunk_rows, count)
+            chunk_times = times[first:last].tolist()
+            chunk_values = values[first:last].tolist()
+            out = smoothed[first:last]
+            for i, (t, z) in enumerate(zip(chunk_times, chunk_values)):
+                dt = t - previous
+                previous = t
+                if dt > 0:
+                    x += v * dt
+                    dt2 = dt * dt
+                    p00 += dt * (2 * p01 + dt * p11) + q * dt2 * dt2 / 4
+                    p01 += dt * p11 + q * dt2 * dt / 2
+                    p11 += q * dt2
+                if z == z:  # not NaN
+                    s = p00 + r
+                    k0, k1 = p00 / s, p01 / s
+                    residual = z - x
+                    x += k0 * residual
+                    v += k1 * residual
+                    p00, p01, p11 = (1 - k0) * p00, (1 - k0) * p01, p11 - k1 * p01
+                out[i] = x
+        return smoothed
+
+
+SMOOTHERS = ('savgol', 'kalman')
+
+
+def smooth_channels(telemetry, smoother, channels=RAW_CHANNELS, chunk_rows=DEFAULT_CHUNK_ROWS):
+    # Recomputes each smoothed channel from its raw counterpart. Smoothed
+    # channels the log doesn't have yet are appended; raw channels it doesn't
+    # have are skipped.
+    times = telemetry['Time [s]']
+    names = list(telemetry.schema.names)
+    derived = {}
+    for target, source in channels.items():
+        if source in telemetry.schema:
+            derived[target] = smoother.apply(times, telemetry[source], chunk_rows)
+            if target not in telemetry.schema:
+                names.append(target)
+    if not derived:
+        return telemetry
+    columns = [derived[name] if name in derived else telemetry[name] for name in names]
+    return Telemetry(TelemetrySchema(names, telemetry.schema.dtype), np.array(columns))
+
+
+def write_csv(telemetry, path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    with open(path, 'w') as file:
+        file.write(','.join(telemetry.schema.names) + '\n')
+        for first in range(0, len(telemetry), chunk_rows):
+            np.savetxt(file, telemetry.columns[:, first:first + chunk_rows].T, delimiter=',', fmt='%.6f')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Resample telemetry to a fixed rate and re-derive smoothed channels")
+    parser.add_argument('data', help="flight telemetry CSV")
+    parser.add_argument('--out', required=True, help="output CSV")
+    parser.add_argument('--rate', type=float, help="output sample rate [Hz] (default: keep the recorded samples)")
+    parser.add_argument('--method', choices=METHODS, default='linear', help="interpolation between samples")
+    parser.add_argument('--smooth', choices=SMOOTHERS, help="recompute the smoothed channels from the raw ones")
+    parser.add_argument('--window', type=int, default=15, help="Savitzky-Golay window [samples, odd]")
+    parser.add_argument('--order', type=int, default=3, help="Savitzky-Golay polynomial order")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS, help="rows processed per chunk")
+    return parser.parse_args()
+
+
+def make_smoother(name, window=15, order=3):
+    if name == 'savgol':
+        return SavitzkyGolay(window, order)
+    if name == 'kalman':
+        return KalmanFilter()
+    raise ValueError(f"unknown smoother {name!r}; expected one of {SMOOTHERS}")
+
+
+def main():
+    args = parse_args()
+    telemetry = DataLoader(args.data).load_data()
+    # Filters run on the recorded samples, before interpolation adds new ones
+    if args.smooth:
+        telemetry = smooth_channels(telemetry, make_smoother(args.smooth, args.window, args.order),
+                                    chunk_rows=args.chunk_rows)
+    if args.rate:
+        telemetry = resample(telemetry, args.rate, args.method, args.chunk_rows)
+    write_csv(telemetry, args.out, args.chunk_rows)
+    print(f"Wrote {len(telemetry)} samples to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,32 +1,25 @@
 import pygame
 import math
+from collections import OrderedDict
 
 
-class RocketRenderer:
-    def __init__(self, image_path, initial_scale=1.0):
-        self.original_image = pygame.image.load(image_path)
-        self.scale = initial_scale
-        self.image = pygame.transform.scale(self.original_image, 
-                                            (int(self.original_image.get_width() * self.scale),
-                                             int(self.original_image.get_height() * self.scale)))
+class RocketAttitude:
+    # Displayed angle easing towards a target, shared by the rocket renderers
+    def __init__(self):
         self.current_angle = 0
         self.target_angle = 0
         self.rotation_speed = 5  # degrees per frame
         self.is_rotating = False
 
-    def set_scale(self, new_scale):
-        self.scale = new_scale
-        self.image = pygame.transform.scale(self.original_image, 
-                                            (int(self.original_image.get_width() * self.scale),
-                                             int(self.original_image.get_height() * self.scale)))
-
-    def get_height(self):
-        return self.image.get_height()
-
     def start_rotation(self, target_angle):
         self.target_angle = target_angle
         self.is_rotating = True
 
+    def reset_rotation(self, angle=0):
+        self.current_angle = angle
+        self.target_angle = angle
+        self.is_rotating = False
+
     def update_rotation(self):
         if self.is_rotating:
             if abs(self.current_angle - self.target_angle) < self.rotation_speed:
@@ -36,7 +29,51 @@ class RocketRenderer:
                 direction = 1 if (self.target_angle - self.current_angle + 360) % 360 < 180 else -1
                 self.current_angle = (self.current_angle + direction * self.rotation_speed) % 360
 
+
+class RocketRenderer(RocketAttitude):
+    def __init__(self, image_path, initial_scale=1.0, angle_resolution=1.0, cache_size=360, warm_up=False):
+        super().__init__()
+        self.original_image = pygame.image.load(image_path)
+        self.scale = initial_scale
+        self.image = pygame.transform.scale(self.original_image, 
+                                            (int(self.original_image.get_width() * self.scale),
+                                             int(self.original_image.get_height() * self.scale)))
+        # Rotated sprites keyed by quantized angle, least recently used first
+        self.angle_resolution = angle_resolution
+        self.cache_size = cache_size
+        self.rotation_cache = OrderedDict()
+        if warm_up:
+            self.warm_up()
+
+    def set_scale(self, new_scale):
+        self.scale = new_scale
+        self.image = pygame.transform.scale(self.original_image, 
+                                            (int(self.original_image.get_width() * self.scale),
+                                             int(self.original_image.get_height() * self.scale)))
+        self.rotation_cache.clear()
+
+    def get_height(self):
+        return self.image.get_height()
+
+    def warm_up(self):
+        # Pre-rotates the full circle, bounded by the cache size
+        steps = math.ceil(360 / self.angle_resolution)
+        for step in range(min(steps, self.cache_size)):
+            self.get_rotated_image(step * self.angle_resolution)
+
+    def get_rotated_image(self, angle):
+        step = round(angle / self.angle_resolution) % math.ceil(360 / self.angle_resolution)
+        rotated_image = self.rotation_cache.get(step)
+        if rotated_image is None:
+            rotated_image = pygame.transform.rotate(self.image, step * self.angle_resolution)
+            self.rotation_cache[step] = rotated_image
+            if len(self.rotation_cache) > self.cache_size:
+                self.rotation_cache.popitem(last=False)
+        else:
+            self.rotation_cache.move_to_end(step)
+        return rotated_image
+
     def render(self, surface, pos_x, pos_y):
-        rotated_image = pygame.transform.rotate(self.image, self.current_angle)
+        rotated_image = self.get_rotated_image(self.current_angle)
         new_rect = rotated_image.get_rect(center=(pos_x, pos_y))
-        surface.blit(rotated_image, new_rect.topleft)
\ No newline at end of file
+        return surface.blit(rotated_image, new_rect.topleft)
\ No newline at end of file
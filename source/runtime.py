@@ -0,0 +1,244 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pygame
+from telemetry import TelemetrySample
+
+DISPLAY_RATE = 60  # frames per second
+INPUT_RATE = 240  # event polls per second
+INGEST_RATE = 60  # live-stream polls per second
+MAX_CATCH_UP = 1.0  # seconds of due steps run back to back before giving up on them
+
+
+class StateSnapshot:
+    # The simulation state after a step. Never modified once published:
+    # Runtime.latest is swapped for a new snapshot instead, so readers on any
+    # thread see either the old state or the new one without taking a lock.
+    # It has the read side of the Simulation interface, so the renderer draws
+    # the published state even if input handling moves the simulation (a
+    # seek, say) before the frame is drawn. The data, derived channels,
+    # statistics index and events are shared with the simulation rather than
+    # copied: they only change when new data arrives, which publishes a new
+    # snapshot anyway.
+    __slots__ = ('sequence', 'wall_time', 'time', 'revision', 'finished', 'schema', 'values',
+                 'data', 'channels', 'stats', 'events', 'window_start', 'max_altitude',
+                 'max_downrange', 'time_index', 'frame', 'other_samples')
+
+    def __init__(self, sequence, wall_time, time, revision, finished, schema, values,
+                 data=None, channels=None, stats=None, events=None, window_start=None,
+                 max_altitude=None, max_downrange=None, time_index=None, frame=0,
+                 other_samples=()):
+        self.sequence = sequence
+        self.wall_time = wall_time
+        self.time = time
+        self.revision = revision
+        self.finished = finished
+        self.schema = schema
+        self.values = values
+        self.data = data
+        self.channels = channels
+        self.stats = stats
+        self.events = events
+        self.window_start = window_start  # absolute index of data[0]; None unless streaming
+        self.max_altitude = max_altitude
+        self.max_downrange = max_downrange
+        # Recorded flights interpolate at `time`; streams read row `frame`
+        self.time_index = time_index
+        self.frame = frame
+        self.other_samples = other_samples  # compared flights, if any
+
+    @classmethod
+    def capture(cls, sequence, simulation):
+        schema = simulation.data.schema
+        sample = simulation.get_current_data()
+        values = np.fromiter((sample[name] for name in schema.names), np.float64, len(schema))
+        others = getattr(simulation, 'others', ())
+        return cls(sequence, time.perf_counter(), simulation.get_current_time(),
+                   simulation.revision, simulation.is_finished(), schema, values,
+                   simulation.data, simulation.channels, simulation.stats, simulation.events,
+                   getattr(simulation, 'window_start', None), simulation.get_max_altitude(),
+                   simulation.get_max_downrange(), simulation.time_index,
+                   simulation.current_frame, tuple(other.get_current_data() for other in others))
+
+    def __getitem__(self, name):
+        return float(self.values[self.schema.index(name)])
+
+    def get_current_time(self):
+        return self.time
+
+    def get_current_data(self):
+        return TelemetrySample(self.schema, self.values)
+
+    def get_current_value(self, name):
+        values = self.channels[name]
+        if self.time_index is not None:
+            return self.time_index.interpolate_values(values, self.time)
+        return float(values[self.frame])
+
+    def get_max_altitude(self):
+        return self.max_altitude
+
+    def get_max_downrange(self):
+        return self.max_downrange
+
+    def is_finished(self):
+        return self.finished
+
+    def samples(self):
+        # Current sample of every flight, as FlightComparison.samples()
+        return [self.get_current_data()] + list(self.other_samples)
+
+
+class Runtime:
+    # Runs input, simulation (or live ingestion) and rendering as separate
+    # asyncio tasks on the main thread, which pygame requires. The simulation
+    # steps against wall-clock deadlines, so a slow frame delays a step but
+    # never loses one; the renderer drops frames instead, and draws each
+    # frame from the latest published StateSnapshot. Blocking work goes to
+    # the executor through offload().
+    def __init__(self, simulation, renderer, profiler, on_event=None, display_rate=DISPLAY_RATE,
+                 input_rate=INPUT_RATE, ingest_rate=INGEST_RATE, workers=None):
+        self.simulation = simulation
+        self.renderer = renderer
+        self.profiler = profiler
+        self.on_event = on_event
+        self.display_rate = display_rate
+        self.input_rate = input_rate
+        self.ingest_rate = ingest_rate
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='runtime')
+        self.latest = None
+        self.sequence = 0
+        self.loop = None
+        self.stopping = None
+        self.pending = set()
+        self.deferred = []
+        self.listeners = []  # called with every published snapshot
+        # Set on shutdown; long offloaded jobs must watch it and return early,
+        # since a running executor job can't be cancelled from outside
+        self.cancelled = threading.Event()
+
+    @property
+    def live(self):
+        return hasattr(self.simulation, 'stream')
+
+    def stop(self):
+        if self.stopping is not None:
+            self.stopping.set()
+
+    def publish(self):
+        self.sequence += 1
+        self.latest = StateSnapshot.capture(self.sequence, self.simulation)
+        for listener in self.listeners:
+            listener(self.latest)
+        return self.latest
+
+    def offload(self, function, *args, then=None):
+        # Runs `function(*args)` on the executor and hands the result to
+        # `then` back on the event loop. Work offloaded before run() starts
+        # with the loop.
+        if self.loop is None:
+            self.deferred.append((function, args, then))
+            return None
+
+        async def finish():
+            result = await self.loop.run_in_executor(self.executor, function, *args)
+            if then is not None:
+                then(result)
+        task = self.loop.create_task(finish())
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+        return task
+
+    async def input_task(self):
+        interval = 1 / self.input_rate
+        while True:
+            with self.profiler.stage('events'):
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        self.stop()
+                    elif self.on_event is not None:
+                        self.on_event(event)
+            await asyncio.sleep(interval)
+
+    async def simulation_task(self):
+        # One fixed clock step per deadline. Deadlines missed while another
+        # task ran are caught up on the next wake-up, up to MAX_CATCH_UP.
+        step = self.simulation.clock.step
+        max_steps = max(int(MAX_CATCH_UP / step), 1)
+        next_step = time.perf_counter() + step
+        while True:
+            await asyncio.sleep(max(next_step - time.perf_counter(), 0.0))
+            now = time.perf_counter()
+            steps = 0
+            with self.profiler.stage('simulation'):
+                while next_step <= now:
+                    self.simulation.update()
+                    next_step += step
+                    steps += 1
+                    if steps == max_steps:
+                        next_step = now + step
+                        break
+            if steps:
+                self.publish()
+                if self.simulation.is_finished():
+                    self.stop()
+
+    async def ingest_task(self):
+        # Live data: picks up new samples from the stream thread, or steps
+        # one sample per poll after the user has scrubbed away from live
+        interval = 1 / self.ingest_rate
+        seen = None
+        while True:
+            stream = self.simulation.stream
+            if not self.simulation.follow_live or stream.total != seen or stream.closed:
+                seen = stream.total
+                with self.profiler.stage('ingest'):
+                    self.simulation.update()
+                if self.simulation.has_data():
+                    self.publish()
+                if self.simulation.is_finished():
+                    self.stop()
+            await asyncio.sleep(interval)
+
+    async def render_task(self):
+        interval = 1 / self.display_rate
+        next_frame = time.perf_counter()
+        while True:
+            state = self.latest
+            if state is not None:  # live streams wait for their first samples
+                self.profiler.begin_frame()
+                with self.profiler.stage('render'):
+                    dirty = self.renderer.render(state)
+                with self.profiler.stage('display'):
+                    pygame.display.update(dirty)
+                self.profiler.end_frame()
+            # Late frames are dropped, not made up
+            now = time.perf_counter()
+            next_frame = max(next_frame + interval, now)
+            await asyncio.sleep(next_frame - now)
+
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        for function, args, then in self.deferred:
+            self.offload(function, *args, then=then)
+        self.deferred.clear()
+        if not self.live:
+            self.publish()
+        coroutines = [self.ingest_task() if self.live else self.simulation_task()]
+        if self.renderer is not None:  # headless when only serving viewers
+            coroutines += [self.input_task(), self.render_task()]
+        tasks = [self.loop.create_task(coroutine) for coroutine in coroutines]
+        stopped = self.loop.create_task(self.stopping.wait())
+        done, _ = await asyncio.wait(tasks + [stopped], return_when=asyncio.FIRST_COMPLETED)
+        for task in tasks + [stopped] + list(self.pending):
+            task.cancel()
+        await asyncio.gather(*tasks, *self.pending, return_exceptions=True)
+        # Running jobs see `cancelled` and return, so this doesn't wait long
+        self.cancelled.set()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        for task in done:
+            if task is not stopped and not task.cancelled() and task.exception() is not None:
+                raise task.exception()
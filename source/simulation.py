@@ -1,20 +1,145 @@
+import numpy as np
+from channels import DerivedChannels
+from events import FlightEvents, detect_events
+from playback import PlaybackClock, TimeIndex
+from range_stats import TelemetryStats
+from telemetry_stream import TelemetryRingBuffer
+
 class Simulation:
-    def __init__(self, data):
+    def __init__(self, data, step=1 / 60, speed=1.0):
         self.data = data
         self.current_frame = 0
+        # Bumped whenever `data` changes, so cached layers know to rebuild
+        self.revision = 0
+        self.time_index = None
+        self.clock = None
+        self.stats = TelemetryStats()
+        self.channels = DerivedChannels(data)
+        self._events = None
+        self._events_revision = None
+        if data is not None:
+            self.stats.update(data, derived=self.channels)
+            self.time_index = TimeIndex(data['Time [s]'])
+            self.clock = PlaybackClock(self.time_index.start, self.time_index.end, step, speed)
+
+    def update(self, real_dt=None):
+        # Without a wall-clock delta, advance exactly one fixed step
+        self.clock.advance(self.clock.step if real_dt is None else real_dt)
+        self.current_frame = self.time_index.seek(self.clock.time)
+
+    def seek(self, time):
+        self.clock.seek(time)
+        self.current_frame = self.time_index.seek(time)
 
-    def update(self):
-        if not self.is_finished():
-            self.current_frame += 1
+    def get_current_time(self):
+        return self.clock.time
+
+    def get_current_data(self):
+        return self.time_index.interpolate(self.data, self.clock.time)
+
+    def get_current_value(self, name):
+        # A single recorded or derived channel at the playback time
+        return self.time_index.interpolate_values(self.channels[name], self.clock.time)
+
+    def is_finished(self):
+        return not self.clock.paused and self.clock.speed > 0 and self.clock.at_end()
+
+    @property
+    def events(self):
+        # Detected once per load (per revision for live streams)
+        if self._events is None or self._events_revision != self.revision:
+            self._events = detect_events(self.data) if self.data is not None else FlightEvents()
+            self._events_revision = self.revision
+        return self._events
+
+    def get_max_altitude(self):
+        return self.stats.max('Smoothed altitude [km]')
+
+    def get_max_downrange(self):
+        return self.stats.max('Downrange distance [km]')
+
+
+class StreamingSimulation(Simulation):
+    # Smallest axis extent reported while the vehicle is still on the pad
+    MIN_AXIS_RANGE = 1e-3
+    # Axes run this far ahead of the data and only move when the vehicle
+    # leaves them, so the cached background isn't redrawn for every sample
+    AXIS_HEADROOM = 0.25
+
+    def __init__(self, stream, follow_live=True):
+        super().__init__(None)
+        self.stream = stream
+        self.follow_live = follow_live
+        # Absolute sample index; current_frame is relative to the buffered
+        # window, which slides forward as old samples are evicted
+        self.position = 0
+        self.window_start = 0
+        # Our own copy of the stream's window. Only new samples are copied
+        # over, under the stream's lock, so the writer thread never touches
+        # data that is being drawn.
+        self.buffer = None
+        self.axis_extents = {}
+        self.refresh()
+
+    def refresh(self):
+        if self.buffer is None and self.stream.buffer is not None:
+            self.buffer = TelemetryRingBuffer(self.stream.buffer.schema, self.stream.capacity)
+        if self.buffer is not None:
+            columns, total = self.stream.read_since(self.buffer.total)
+            if total != self.buffer.total or self.data is None:
+                # Samples the stream evicted before we saw them are skipped
+                self.buffer.total = total - columns.shape[1]
+                self.buffer.extend(columns)
+                self.data = self.buffer.window()
+                self.window_start = total - len(self.buffer)
+                self.revision = total
+                self.channels.update(self.data)
+                self.stats.update(self.data, self.window_start, self.channels)
+        if self.has_data():
+            self.position = min(max(self.position, self.window_start), self.window_start + len(self.data) - 1)
+            self.current_frame = self.position - self.window_start
+
+    def has_data(self):
+        return self.data is not None and len(self.data) > 0
+
+    def update(self, real_dt=None):
+        # Live data is followed sample by sample; the playback clock only
+        # applies to recorded flights
+        self.stream.check()
+        if self.follow_live:
+            self.position = self.stream.total
+        else:
+            self.position += 1
+        self.refresh()
+
+    def seek(self, time):
+        if self.has_data():
+            self.follow_live = False
+            self.position = self.window_start + int(np.searchsorted(self.data['Time [s]'], time, side='right')) - 1
+            self.refresh()
+
+    def get_current_time(self):
+        return self.get_current_data()['Time [s]']
 
     def get_current_data(self):
         return self.data[self.current_frame]
 
+    def get_current_value(self, name):
+        return float(self.channels[name][self.current_frame])
+
     def is_finished(self):
-        return self.current_frame >= len(self.data) - 1
+        return self.stream.closed and self.position >= self.stream.total - 1
+
+    def _axis_extent(self, name, value):
+        value = max(value, self.MIN_AXIS_RANGE)
+        extent = self.axis_extents.get(name)
+        # Shrinks (once old samples are evicted) only well below the data
+        if extent is None or value > extent or value * (1 + self.AXIS_HEADROOM) ** 2 < extent:
+            extent = self.axis_extents[name] = value * (1 + self.AXIS_HEADROOM)
+        return extent
 
     def get_max_altitude(self):
-        return max(d['Smoothed altitude [km]'] for d in self.data)
+        return self._axis_extent('altitude', super().get_max_altitude())
 
     def get_max_downrange(self):
-        return max(d['Downrange distance [km]'] for d in self.data)
\ No newline at end of file
+        return self._axis_extent('downrange', super().get_max_downrange())
\ No newline at end of file
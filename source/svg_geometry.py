@@ -0,0 +1,74 @@
+import math
+import numpy as np
+from svgpathtools import Document, Line
+
+# Curves are split into chords of about this length, in SVG units
+DEFAULT_TOLERANCE = 0.5
+MAX_CURVE_POINTS = 64
+
+
+def _segment_points(segment, tolerance):
+    # Points along one segment, end points included
+    if isinstance(segment, Line):
+        return np.array([segment.start, segment.end])
+    if hasattr(segment, 'bpoints'):
+        control = np.array(segment.bpoints())
+        length = np.abs(np.diff(control)).sum()  # control polygon bounds the arc length
+    else:
+        length = segment.length()
+    count = min(max(math.ceil(length / tolerance), 2), MAX_CURVE_POINTS) + 1
+    ts = np.linspace(0.0, 1.0, count)
+    if hasattr(segment, 'points'):
+        return np.asarray(segment.points(ts))
+    return np.array([segment.point(t) for t in ts])
+
+
+def flatten_paths(paths, tolerance=DEFAULT_TOLERANCE):
+    # All paths as one (N, 2) vertex array plus polyline start offsets
+    # (`offsets[i]:offsets[i + 1]` is polyline i). Segments that continue
+    # where the previous one ended share a polyline.
+    chunks, offsets, total = [], [0], 0
+    for path in paths:
+        end = None
+        for segment in path:
+            points = _segment_points(segment, tolerance)
+            if end is not None and abs(segment.start - end) < 1e-9:
+                points = points[1:]
+            elif total > offsets[-1]:
+                offsets.append(total)
+            chunks.append(points)
+            total += len(points)
+            end = segment.end
+        if total > offsets[-1]:
+            offsets.append(total)
+    if not chunks:
+        return np.empty((0, 2)), np.zeros(1, dtype=np.int64)
+    vertices = np.concatenate(chunks)
+    return np.column_stack((vertices.real, vertices.imag)), np.array(offsets, dtype=np.int64)
+
+
+class SvgGeometry:
+    # Flattened outline of an SVG drawing, centered on its bounding box.
+    # Vertices are in SVG units with y pointing down, like the screen.
+    def __init__(self, vertices, offsets):
+        lo, hi = vertices.min(axis=0), vertices.max(axis=0)
+        self.width, self.height = hi - lo
+        self.vertices = vertices - (lo + hi) / 2
+        self.offsets = offsets
+
+    @classmethod
+    def from_file(cls, svg_path, tolerance=DEFAULT_TOLERANCE):
+        # Document applies group transforms, unlike svg2paths
+        return cls(*flatten_paths(Document(svg_path).paths(), tolerance))
+
+    @property
+    def polyline_count(self):
+        return len(self.offsets) - 1
+
+    def transform(self, angle, scale):
+        # All vertices rotated counterclockwise on screen by `angle` degrees
+        # (the same sense as pygame.transform.rotate) and scaled, in one product
+        rad = math.radians(angle)
+        cos, sin = math.cos(rad) * scale, math.sin(rad) * scale
+        matrix = np.array([[cos, sin], [-sin, cos]])
+        return self.vertices @ matrix.T
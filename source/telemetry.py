@@ -0,0 +1,122 @@
+import numpy as np
+
+# Bump whenever the in-memory layout changes so on-disk caches are rebuilt
+SCHEMA_VERSION = 1
+
+
+class TelemetrySchema:
+    def __init__(self, names, dtype=np.float64):
+        self.names = tuple(names)
+        self.dtype = np.dtype(dtype)
+        self._index = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __eq__(self, other):
+        return isinstance(other, TelemetrySchema) and self.names == other.names and self.dtype == other.dtype
+
+    def index(self, name):
+        return self._index[name]
+
+
+class TelemetryRow:
+    # Lightweight view of one sample; reads straight from the columns
+    __slots__ = ('_telemetry', '_index')
+
+    def __init__(self, telemetry, index):
+        self._telemetry = telemetry
+        self._index = index
+
+    def __getitem__(self, name):
+        return float(self._telemetry.column(name)[self._index])
+
+    def __contains__(self, name):
+        return name in self._telemetry.schema
+
+    def get(self, name, default=None):
+        return self[name] if name in self else default
+
+    def keys(self):
+        return self._telemetry.schema.names
+
+    def to_dict(self):
+        return {name: self[name] for name in self.keys()}
+
+
+class TelemetrySample:
+    # A standalone sample (e.g. interpolated between two rows) with the same
+    # read interface as TelemetryRow
+    __slots__ = ('schema', 'values')
+
+    def __init__(self, schema, values):
+        self.schema = schema
+        self.values = values
+
+    def __getitem__(self, name):
+        return float(self.values[self.schema.index(name)])
+
+    def __contains__(self, name):
+        return name in self.schema
+
+    def get(self, name, default=None):
+        return self[name] if name in self else default
+
+    def keys(self):
+        return self.schema.names
+
+    def to_dict(self):
+        return dict(zip(self.schema.names, self.values.tolist()))
+
+
+class Telemetry:
+    def __init__(self, schema, columns):
+        columns = np.asarray(columns, dtype=schema.dtype)
+        if columns.ndim != 2 or columns.shape[0] != len(schema):
+            raise ValueError(f"expected {len(schema)} channels, got array of shape {columns.shape}")
+        if columns.shape[1] and columns.strides[1] != columns.itemsize:
+            columns = np.ascontiguousarray(columns)
+        self.schema = schema
+        # One row per channel, so every channel is a contiguous block. Windows
+        # sliced out of a wider buffer are accepted as-is since each channel
+        # is still contiguous on its own.
+        self._columns = columns
+
+    @classmethod
+    def from_rows(cls, names, rows):
+        schema = TelemetrySchema(names)
+        columns = np.array(rows, dtype=schema.dtype).reshape(-1, len(schema)).T
+        return cls(schema, columns)
+
+    def __len__(self):
+        return self._columns.shape[1]
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.column(key)
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("telemetry index out of range")
+        return TelemetryRow(self, key)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield TelemetryRow(self, i)
+
+    @property
+    def columns(self):
+        return self._columns
+
+    def column(self, name):
+        return self._columns[self.schema.index(name)]
+
+    @property
+    def nbytes(self):
+        return self._columns.nbytes
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+from telemetry import SCHEMA_VERSION, Telemetry, TelemetrySchema
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'super-heavy-simulation')
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TelemetryCache:
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or default_cache_dir()
+
+    def _paths(self, source_path, digest):
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        base = os.path.join(self.cache_dir, f"{stem}-v{SCHEMA_VERSION}-{digest[:32]}")
+        return base + '.npy', base + '.json'
+
+    def load(self, source_path, digest=None):
+        digest = digest or file_digest(source_path)
+        data_path, meta_path = self._paths(source_path, digest)
+        try:
+            with open(meta_path, 'r') as file:
+                meta = json.load(file)
+            if meta.get('schema_version') != SCHEMA_VERSION or meta.get('sha256') != digest:
+                return None
+            # Read-only memory map: channels are paged in on first touch, nothing is copied
+            columns = np.load(data_path, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        schema = TelemetrySchema(meta['names'], meta['dtype'])
+        if columns.dtype != schema.dtype or columns.shape[0] != len(schema):
+            return None
+        return Telemetry(schema, columns)
+
+    def store(self, source_path, telemetry, digest=None):
+        digest = digest or file_digest(source_path)
+        data_path, meta_path = self._paths(source_path, digest)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._remove_stale(source_path, data_path, meta_path)
+
+        meta = {
+            'schema_version': SCHEMA_VERSION,
+            'sha256': digest,
+            'source': os.path.abspath(source_path),
+            'names': list(telemetry.schema.names),
+            'dtype': telemetry.schema.dtype.str,
+        }
+        # Write to temp files first so a crashed writer never leaves a
+        # half-written entry; the names are unique, so processes caching the
+        # same file at once don't write over each other's temp files
+        tmp_data = self._temp_file(data_path)
+        tmp_meta = self._temp_file(meta_path)
+        try:
+            with open(tmp_data, 'wb') as file:
+                np.save(file, np.ascontiguousarray(telemetry.columns))
+            with open(tmp_meta, 'w') as file:
+                json.dump(meta, file)
+            os.replace(tmp_data, data_path)
+            os.replace(tmp_meta, meta_path)
+        finally:
+            for path in (tmp_data, tmp_meta):
+                if os.path.exists(path):
+                    os.remove(path)
+        return data_path
+
+    def _temp_file(self, path):
+        handle, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=self.cache_dir)
+        os.close(handle)
+        return temp_path
+
+    def _remove_stale(self, source_path, data_path, meta_path):
+        stem = os.path.splitext(os.path.basename(source_path))[0] + '-v'
+        source = os.path.abspath(source_path)
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if not name.startswith(stem) or not name.endswith('.json') or path == meta_path:
+                continue
+            try:
+                with open(path, 'r') as file:
+                    if json.load(file).get('source') != source:
+                        continue
+                os.remove(path)
+                os.remove(path[:-len('.json')] + '.npy')
+            except (OSError, ValueError):
+                pass
@@ -0,0 +1,197 @@
+import argparse
+import csv
+import os
+import socket
+import threading
+import time
+import numpy as np
+from telemetry import Telemetry, TelemetrySchema
+
+DEFAULT_CAPACITY = 1 << 16
+
+
+class StreamError(Exception):
+    # The source of a TelemetryStream failed (e.g. a refused or dropped connection)
+    pass
+
+
+class TelemetryRingBuffer:
+    def __init__(self, schema, capacity=DEFAULT_CAPACITY):
+        self.schema = schema
+        self.capacity = capacity
+        # Every sample is written twice, at i and i + capacity, so the newest
+        # `capacity` samples are always one contiguous slice of the storage
+        self._storage = np.zeros((len(schema), 2 * capacity), dtype=schema.dtype)
+        self.total = 0
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def append(self, row):
+        i = self.total % self.capacity
+        self._storage[:, i] = row
+        self._storage[:, i + self.capacity] = row
+        self.total += 1
+
+    def extend(self, columns):
+        # Appends a block of samples (one column each); only the newest
+        # `capacity` of them can be kept
+        count = columns.shape[1]
+        columns = columns[:, max(count - self.capacity, 0):]
+        positions = (self.total + max(count - self.capacity, 0) + np.arange(columns.shape[1])) % self.capacity
+        self._storage[:, positions] = columns
+        self._storage[:, positions + self.capacity] = columns
+        self.total += count
+
+    def since(self, total):
+        # Copies of the samples appended after the first `total`, as far back
+        # as the buffer still holds them
+        count = min(self.total - total, len(self))
+        end = self.total % self.capacity + self.capacity
+        return self._storage[:, end - count:end].copy()
+
+    def window(self, copy=False):
+        count = len(self)
+        start = (self.total - count) % self.capacity
+        columns = self._storage[:, start:start + count]
+        return Telemetry(self.schema, columns.copy() if copy else columns)
+
+
+def parse_line(line):
+    return [float(v) if v else 0 for v in next(csv.reader([line.strip()]))]
+
+
+def follow_file(path, poll_interval=0.05, stop_event=None):
+    # tail -f: yields lines from the start of the file and keeps waiting for more
+    with open(path, 'r') as file:
+        pending = ''
+        while stop_event is None or not stop_event.is_set():
+            chunk = file.readline()
+            if not chunk:
+                time.sleep(poll_interval)
+                continue
+            pending += chunk
+            if pending.endswith('\n'):
+                yield pending
+                pending = ''
+
+
+def read_socket(address, stop_event=None):
+    # `address` is either a (host, port) tuple or the path of a unix socket
+    family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.connect(address)
+        with sock.makefile('r') as file:
+            for line in file:
+                if stop_event is not None and stop_event.is_set():
+                    break
+                yield line
+
+
+class TelemetryStream:
+    def __init__(self, source, capacity=DEFAULT_CAPACITY, schema=None):
+        # `source` is any iterable of CSV lines or numeric rows: a generator,
+        # an open pipe, follow_file(...) or read_socket(...). Without an
+        # explicit schema the first item is taken as the CSV header.
+        self.source = source
+        self.capacity = capacity
+        self.buffer = TelemetryRingBuffer(schema, capacity) if schema is not None else None
+        self.lock = threading.Lock()
+        self.schema_ready = threading.Event()
+        self.stop_event = threading.Event()
+        self.closed = False
+        self.error = None
+        # Lines that didn't parse or had the wrong number of values are
+        # skipped rather than ending the stream
+        self.skipped = 0
+        self._thread = None
+        if schema is not None:
+            self.schema_ready.set()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='telemetry-stream', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    def check(self):
+        # Raises StreamError once the stream has closed because its source failed
+        if self.closed and self.error is not None:
+            raise StreamError(f"telemetry stream failed: {self.error}") from self.error
+
+    def _run(self):
+        try:
+            for item in self.source:
+                if self.stop_event.is_set():
+                    break
+                if isinstance(item, str):
+                    if not item.strip():
+                        continue
+                    if self.buffer is None:
+                        self._set_schema(next(csv.reader([item.strip()])))
+                        continue
+                    try:
+                        item = parse_line(item)
+                    except ValueError:
+                        item = None
+                if item is None or len(item) != len(self.buffer.schema):
+                    self.skipped += 1
+                    continue
+                with self.lock:
+                    self.buffer.append(item)
+        except Exception as error:
+            self.error = error
+        finally:
+            self.closed = True
+            self.schema_ready.set()
+
+    def _set_schema(self, names):
+        self.buffer = TelemetryRingBuffer(TelemetrySchema(names), self.capacity)
+        self.schema_ready.set()
+
+    @property
+    def total(self):
+        return self.buffer.total if self.buffer is not None else 0
+
+    def snapshot(self, copy=False):
+        # Returns the buffered window and the absolute index of its first
+        # sample. The view is zero-copy; once the buffer wraps, the writer may
+        # replace its oldest sample while it's in use. Pass copy=True, or keep
+        # a local buffer up to date with read_since(), to avoid that.
+        if self.buffer is None:
+            return None, 0
+        with self.lock:
+            return self.buffer.window(copy), self.buffer.total - len(self.buffer)
+
+    def read_since(self, total):
+        # The samples that arrived after the first `total` (copied, so the
+        # writer is free to overwrite them) and the new total
+        if self.buffer is None:
+            return None, 0
+        with self.lock:
+            return self.buffer.since(total), self.buffer.total
+
+
+def replay_to_file(source_path, target_path, rate=10.0):
+    # Stand-in for a live feed: appends the rows of a recorded CSV to
+    # `target_path` at `rate` rows per second
+    with open(source_path, 'r') as source, open(target_path, 'w') as target:
+        target.write(source.readline())
+        target.flush()
+        for line in source:
+            target.write(line)
+            target.flush()
+            time.sleep(1.0 / rate)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded flight into a file to test streaming mode")
+    parser.add_argument('source', help="recorded flight CSV")
+    parser.add_argument('target', help="file to append rows to (tail it with main.py --stream)")
+    parser.add_argument('--rate', type=float, default=10.0, help="rows per second")
+    args = parser.parse_args()
+    if os.path.exists(args.target):
+        os.remove(args.target)
+    replay_to_file(args.source, args.target, args.rate)
@@ -0,0 +1,92 @@
+from collections import OrderedDict
+import pygame
+
+DEFAULT_CACHE_SIZE = 256
+NUMERIC_CHARS = "0123456789.-+ "
+OVERFLOW_CHAR = "#"
+
+
+class TextCache:
+    # Rendered (and optionally rotated) text surfaces for one font and
+    # color, least recently used first
+    def __init__(self, font, color, cache_size=DEFAULT_CACHE_SIZE):
+        self.font = font
+        self.color = color
+        self.cache_size = cache_size
+        self.surfaces = OrderedDict()
+
+    def render(self, text, angle=0):
+        key = (text, angle)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.font.render(text, True, self.color)
+            if angle:
+                surface = pygame.transform.rotate(surface, angle)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.cache_size:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+
+class GlyphAtlas:
+    # One pre-rendered surface per character on a fixed-width grid, so a
+    # readout can redraw single characters in place. Digits come pre-rendered;
+    # anything else (e.g. "nan") is rendered on first use.
+    def __init__(self, font, color, chars=NUMERIC_CHARS):
+        self.font = font
+        self.color = color
+        self.glyphs = {}
+        for char in chars:
+            self.glyph(char)
+        self.cell_width = max(glyph.get_width() for glyph in self.glyphs.values())
+        self.cell_height = font.get_height()
+
+    def glyph(self, char):
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            glyph = self.glyphs[char] = self.font.render(char, True, self.color)
+        return glyph
+
+
+class GlyphReadout:
+    # A right-aligned value of up to `width` characters at a fixed position;
+    # a value that doesn't fit shows as a row of OVERFLOW_CHAR rather than
+    # losing its leading digits. Only the cells whose character changed since the last draw are
+    # restored from `background` and redrawn.
+    def __init__(self, atlas, position, width, fmt="{:.2f}"):
+        self.atlas = atlas
+        self.position = position
+        self.width = width
+        self.fmt = fmt
+        self.text = None
+
+    @property
+    def rect(self):
+        return pygame.Rect(self.position, (self.atlas.cell_width * self.width, self.atlas.cell_height))
+
+    def invalidate(self):
+        # Forces a full redraw, e.g. after the area was overwritten
+        self.text = None
+
+    def draw(self, surface, background, value):
+        text = self.fmt.format(value).rjust(self.width)
+        if len(text) > self.width:
+            text = OVERFLOW_CHAR * self.width
+        previous = self.text or ' ' * self.width
+        atlas = self.atlas
+        x0, y = self.position
+        rects, blits = [], []
+        for i, char in enumerate(text):
+            if self.text is not None and char == previous[i]:
+                continue
+            cell = pygame.Rect(x0 + i * atlas.cell_width, y, atlas.cell_width, atlas.cell_height)
+            surface.blit(background, cell, cell)
+            if char != ' ':
+                # Clipped to the cell so a wide glyph can't leave pixels behind
+                blits.append((atlas.glyph(char), cell, pygame.Rect(0, 0, cell.width, cell.height)))
+            rects.append(cell)
+        surface.blits(blits, doreturn=False)
+        self.text = text
+        return [rects[0].unionall(rects[1:])] if rects else []
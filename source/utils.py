@@ -11,8 +11,8 @@ def rotate_point(x, y, cx, cy, angle):
     rotated_y = cy + dx * math.sin(rad) + dy * math.cos(rad)
     return rotated_x, rotated_y
 
-def calculate_top_position(pos_x, pos_y, angle, rocket_height, time):
-    if is_rocket_inverted(time):
+def calculate_top_position(pos_x, pos_y, angle, rocket_height, time, separation_time):
+    if is_rocket_inverted(time, separation_time):
         angle += 0  # Inverte o ângulo se o foguete estiver de cabeça para baixo
     
     angle_rad = math.radians(angle)
@@ -20,6 +20,6 @@ def calculate_top_position(pos_x, pos_y, angle, rocket_height, time):
     top_y = pos_y - rocket_height * math.cos(angle_rad)
     return top_x, top_y
 
-def is_rocket_inverted(time):
-    stage_separation_time = 60*2 + 48  # Tempo da separação dos estágios
-    return time > stage_separation_time
\ No newline at end of file
+def is_rocket_inverted(time, separation_time):
+    # separation_time comes from the flight's detected events (None if not reached)
+    return separation_time is not None and time > separation_time
\ No newline at end of file
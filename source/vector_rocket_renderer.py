@@ -0,0 +1,47 @@
+import math
+import numpy as np
+import pygame
+from constants import BLACK
+from rocket_renderer import RocketAttitude
+from svg_geometry import SvgGeometry
+
+# The booster drawing is in millimetres; 96 dpi matches the PNG export
+SVG_PIXELS_PER_UNIT = 96 / 25.4
+
+
+class VectorRocketRenderer(RocketAttitude):
+    # Drop-in alternative to RocketRenderer that draws the SVG outline. The
+    # paths are flattened once; each frame is one matrix product plus one
+    # draw call per polyline into a canvas just big enough for the result.
+    def __init__(self, svg_path, initial_scale=1.0, pixels_per_unit=SVG_PIXELS_PER_UNIT, color=BLACK, antialias=True):
+        super().__init__()
+        self.geometry = SvgGeometry.from_file(svg_path)
+        self.pixels_per_unit = pixels_per_unit
+        self.color = color
+        self.antialias = antialias
+        self.set_scale(initial_scale)
+
+    def set_scale(self, new_scale):
+        self.scale = new_scale
+        # Any rotation of the drawing fits in a square the size of its diagonal
+        diagonal = math.hypot(self.geometry.width, self.geometry.height) * self.pixels_per_unit * new_scale
+        side = math.ceil(diagonal) + 4
+        self.canvas = pygame.Surface((side, side), pygame.SRCALPHA)
+
+    def get_height(self):
+        return int(self.geometry.height * self.pixels_per_unit * self.scale)
+
+    def render(self, surface, pos_x, pos_y):
+        points = self.geometry.transform(self.current_angle, self.pixels_per_unit * self.scale)
+        origin = np.floor(points.min(axis=0)) - 1
+        size = np.ceil(points.max(axis=0)) + 2 - origin
+        area = pygame.Rect(0, 0, int(size[0]), int(size[1]))
+        self.canvas.fill((0, 0, 0, 0), area)
+
+        local = (points - origin).tolist()
+        offsets = self.geometry.offsets
+        draw = pygame.draw.aalines if self.antialias else pygame.draw.lines
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            if end - start >= 2:
+                draw(self.canvas, self.color, False, local[start:end])
+        return surface.blit(self.canvas, (pos_x + origin[0], pos_y + origin[1]), area)
@@ -0,0 +1,69 @@
+MIN_SPAN = 1e-4  # deepest zoom, as a fraction of the full extent
+
+
+class Viewport:
+    # Visible window of the trajectory plot. The window is kept as fractions
+    # of the full data extent, so a live stream can grow the extent without
+    # losing the current zoom.
+    def __init__(self, plot_rect, max_x=1.0, max_y=1.0):
+        self.plot_rect = plot_rect
+        self.max_x = max_x
+        self.max_y = max_y
+        self.reset()
+
+    def reset(self):
+        self.u0, self.u1 = 0.0, 1.0
+        self.v0, self.v1 = 0.0, 1.0
+
+    @property
+    def state(self):
+        return (tuple(self.plot_rect), self.max_x, self.max_y, self.u0, self.u1, self.v0, self.v1)
+
+    @property
+    def is_zoomed(self):
+        return (self.u0, self.u1, self.v0, self.v1) != (0.0, 1.0, 0.0, 1.0)
+
+    def set_extent(self, max_x, max_y):
+        self.max_x = max_x
+        self.max_y = max_y
+
+    def bounds(self):
+        # (x0, x1, y0, y1) in data units
+        return self.u0 * self.max_x, self.u1 * self.max_x, self.v0 * self.max_y, self.v1 * self.max_y
+
+    def project(self, x, y):
+        # Data units to screen pixels; works on scalars and numpy arrays
+        x0, x1, y0, y1 = self.bounds()
+        rect = self.plot_rect
+        screen_x = rect.left + (x - x0) / (x1 - x0) * rect.width
+        screen_y = rect.bottom - (y - y0) / (y1 - y0) * rect.height
+        return screen_x, screen_y
+
+    def _to_fraction(self, screen_x, screen_y):
+        rect = self.plot_rect
+        u = self.u0 + (screen_x - rect.left) / rect.width * (self.u1 - self.u0)
+        v = self.v0 + (rect.bottom - screen_y) / rect.height * (self.v1 - self.v0)
+        return u, v
+
+    def zoom(self, factor, anchor=None):
+        # factor > 1 zooms in, keeping the point under `anchor` (screen pixels) fixed
+        anchor = anchor or self.plot_rect.center
+        u, v = self._to_fraction(*anchor)
+        span_u = min(max((self.u1 - self.u0) / factor, MIN_SPAN), 1.0)
+        span_v = min(max((self.v1 - self.v0) / factor, MIN_SPAN), 1.0)
+        au = (u - self.u0) / (self.u1 - self.u0)
+        av = (v - self.v0) / (self.v1 - self.v0)
+        self._set_window(u - au * span_u, span_u, v - av * span_v, span_v)
+
+    def pan(self, dx, dy):
+        # Moves the content by (dx, dy) screen pixels
+        rect = self.plot_rect
+        du = -dx / rect.width * (self.u1 - self.u0)
+        dv = dy / rect.height * (self.v1 - self.v0)
+        self._set_window(self.u0 + du, self.u1 - self.u0, self.v0 + dv, self.v1 - self.v0)
+
+    def _set_window(self, u0, span_u, v0, span_v):
+        u0 = min(max(u0, 0.0), 1.0 - span_u)
+        v0 = min(max(v0, 0.0), 1.0 - span_v)
+        self.u0, self.u1 = u0, u0 + span_u
+        self.v0, self.v1 = v0, v0 + span_v
\ No newline at end of file
@@ -1,10 +1,18 @@
 import pygame
 import math
+import os
 import random
 import csv
+import sys
+import numpy as np
 import pygame.gfxdraw
 from svgpathtools import svg2paths, Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'source'))
+from events import BOOSTBACK_END, detect_events
+from svg_geometry import SvgGeometry
+from telemetry import Telemetry
+
 # Inicializar Pygame
 pygame.init()
 
@@ -36,16 +44,6 @@ def draw_trajectory_points(surface, data, max_altitude, max_downrange):
         surface.blit(text_surface, (int(x) + 5, int(y) - 15))
 
 def draw_trajectory_events(surface, data, max_altitude, max_downrange):
-    events = [
-        ("Max Q", 60),
-        ("MECO", 60*2 + 42),
-        ("Stage sep", 60*2 + 48),
-        ("Boostback start", 60*2 + 54),
-        ("Boostback end", 60*3 + 48),
-        ("Gridfins live", 60*6 + 5),
-        ("Landing burn", 60*6 + 54),
-    ]
-    
     font = pygame.font.Font(None, 18)
     for label, time in events:
         point = next(p for p in data if p['Time [s]'] >= time)
@@ -86,7 +84,8 @@ def analyze_svg_orientation(paths):
     return "normal" if top_width < bottom_width else "inverted"
 
 # Carregar o SVG e determinar sua orientação
-paths, attributes = svg2paths('/home/luisgoc/workspace/super-heavy-simulation/assets/imgs/super_heavy.svg')
+svg_file = '/home/luisgoc/workspace/super-heavy-simulation/assets/imgs/super_heavy.svg'
+paths, attributes = svg2paths(svg_file)
 svg_orientation = analyze_svg_orientation(paths)
 print(f"Orientação do SVG: {svg_orientation}")
 
@@ -111,8 +110,15 @@ svg_top_y = ymin if svg_orientation == "normal" else ymax
 # Calcular fator de escala
 scale = min(width * 0.1 / svg_width, height * 0.2 / svg_height)
 
-# Criar uma superfície para desenhar com anti-aliasing
-drawing_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+# Contorno do SVG achatado uma única vez, com o topo do foguete para cima
+geometry = SvgGeometry.from_file(svg_file)
+if svg_orientation == "inverted":
+    geometry = SvgGeometry(geometry.vertices * (1, -1), geometry.offsets)
+
+# Superfície para desenhar com anti-aliasing; qualquer rotação do foguete
+# cabe num quadrado do tamanho da diagonal
+svg_canvas_side = math.ceil(math.hypot(geometry.width, geometry.height) * scale) + 4
+svg_canvas = pygame.Surface((svg_canvas_side, svg_canvas_side), pygame.SRCALPHA)
 
 # Carregar dados do CSV
 data = []
@@ -121,10 +127,13 @@ with open('/home/luisgoc/workspace/super-heavy-simulation/assets/data/IFT3_full_
     for row in csv_reader:
         data.append({k: float(v) if v else 0 for k, v in row.items()})
 
+# Eventos detectados a partir da telemetria
+events = detect_events(Telemetry.from_rows(list(data[0].keys()), [list(row.values()) for row in data]))
+
 # Função para determinar se o foguete está invertido
 def is_rocket_inverted(time):
-    boostback_end_time = 60*3 + 48  # Tempo do Boostback end
-    return time > boostback_end_time
+    boostback_end_time = events.time(BOOSTBACK_END)  # Tempo do Boostback end
+    return boostback_end_time is not None and time > boostback_end_time
 
 def calculate_top_position(pos_x, pos_y, angle, rocket_height, time):
     if is_rocket_inverted(time):
@@ -142,49 +151,29 @@ def calculate_top_position(pos_x, pos_y, angle, rocket_height, time):
 def map_value(value, start1, stop1, start2, stop2):
     return start2 + (stop2 - start2) * ((value - start1) / (stop1 - start1))
 
-def rotate_point(x, y, cx, cy, angle):
-    rad = math.radians(angle)
-    dx = x - cx
-    dy = y - cy
-    rotated_x = cx + dx * math.cos(rad) - dy * math.sin(rad)
-    rotated_y = cy + dx * math.sin(rad) + dy * math.cos(rad)
-    return rotated_x, rotated_y
-
-def draw_aa_line(surface, color, start_pos, end_pos, width=1):
-    pygame.draw.line(surface, color, start_pos, end_pos, width)
-
 # Função para desenhar o SVG
-def draw_svg(surface, paths, angle, pos_x, pos_y, time):
-    surface.fill((0, 0, 0, 0))  # Limpar com transparência
-    
+def draw_svg(surface, geometry, angle, pos_x, pos_y, time):
     if is_rocket_inverted(time):
         angle += -90  # Inverte o ângulo se o foguete estiver de cabeça para baixo
-    
-    rotation_point_y = (ymin - svg_top_y) * scale if svg_orientation == "normal" else (ymax - svg_top_y) * scale
-    
-    for path in paths:
-        points = []
-        for segment in path:
-            start = segment.start
-            end = segment.end
-            scaled_start_x = (start.real - svg_center_x) * scale
-            scaled_start_y = (start.imag - svg_top_y) * scale
-            scaled_end_x = (end.real - svg_center_x) * scale
-            scaled_end_y = (end.imag - svg_top_y) * scale
-            
-            if svg_orientation == "inverted":
-                scaled_start_y = -scaled_start_y
-                scaled_end_y = -scaled_end_y
-            
-            rotated_start = rotate_point(scaled_start_x, scaled_start_y, 0, rotation_point_y, angle)
-            rotated_end = rotate_point(scaled_end_x, scaled_end_y, 0, rotation_point_y, angle)
-            
-            points.extend([(rotated_start[0] + pos_x, rotated_start[1] + pos_y - rotation_point_y),
-                           (rotated_end[0] + pos_x, rotated_end[1] + pos_y - rotation_point_y)])
-        
-        if len(points) >= 2:
-            for i in range(0, len(points) - 1, 2):
-                draw_aa_line(surface, BLACK, points[i], points[i+1], 1)
+
+    # Todos os vértices girados (em sentido horário na tela) e escalados de
+    # uma vez; o topo do foguete fica em (pos_x, pos_y)
+    points = geometry.transform(-angle, scale)
+    rad = math.radians(angle)
+    top = geometry.height / 2 * scale * np.array([math.sin(rad), -math.cos(rad)])
+    points += np.array([pos_x, pos_y]) - top
+
+    # Desenha só a caixa que contém o foguete e a copia para a tela
+    origin = np.floor(points.min(axis=0)) - 1
+    size = np.ceil(points.max(axis=0)) + 2 - origin
+    area = pygame.Rect(0, 0, int(size[0]), int(size[1]))
+    svg_canvas.fill((0, 0, 0, 0), area)
+    local = (points - origin).tolist()
+    offsets = geometry.offsets
+    for start, end in zip(offsets[:-1], offsets[1:]):
+        if end - start >= 2:
+            pygame.draw.aalines(svg_canvas, BLACK, False, local[start:end])
+    surface.blit(svg_canvas, (origin[0], origin[1]), area)
 
 # Função para desenhar partículas de fogo
 def draw_fire_particles(surface, x, y, angle, speed, time):
@@ -309,8 +298,7 @@ while running and frame < len(data):
 
 
     # Desenhar o SVG rotacionado e posicionado
-    draw_svg(drawing_surface, paths, angle, pos_x, pos_y, current_time)
-    screen.blit(drawing_surface, (0, 0))
+    draw_svg(screen, geometry, angle, pos_x, pos_y, current_time)
 
 
     # Desenhar partículas de fogo